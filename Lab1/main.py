@@ -2,7 +2,7 @@ from order import DineInOrderFactory, TakeawayOrderFactory
 from cost_calculator import RegularCostCalculator, DiscountedCostCalculator
 from report_generator import TextReportGenerator, HTMLReportGenerator
 from order_manager import OrderManager
-from meal_builder import ComboMealBuilder, MealDirector
+from meal_builder import ComboMealBuilder, MealDirector, COMBO_TEMPLATES
 
 
 # Function to take user input for an order
@@ -35,6 +35,10 @@ def get_order_items():
         if item_name.lower() == 'done':
             break
         quantity = int(input(f"Enter quantity for {item_name}: "))
+        # A prebuilt combo adds its priced line items, no price needed
+        if item_name in COMBO_TEMPLATES:
+            items.extend(COMBO_TEMPLATES[item_name].order_items(quantity))
+            continue
         price = float(input(f"Enter price for {item_name}: "))
         items.append((item_name, quantity, price))
     return items
@@ -1,20 +1,51 @@
 from abc import ABC, abstractmethod
 
+# Unit prices of the items the combo builder puts into a meal
+MENU_PRICES = {"Burger": 8.5, "Soda": 1.99, "Ice Cream": 3.8}
 
-# Complex object Meal
+
+# Complex object Meal; items added without a price are looked up in prices
 class Meal:
-    def __init__(self):
+    def __init__(self, prices=MENU_PRICES):
         self.items = []
-
-    def add_item(self, item):
+        self.line_items = []  # (item, quantity, price) of every item
+        self.price = 0
+        self.prices = prices
+        self._description = None  # show_items result, rebuilt after a change
+
+    def add_item(self, item, price=None):
+        if price is None:
+            price = self.prices.get(item)
+            if price is None:
+                raise ValueError(f"No price for meal item: {item}")
         self.items.append(item)
+        self.line_items.append((item, 1, price))
+        self.price += price
+        self._description = None
 
     def show_items(self):
-        return ", ".join(self.items)
+        if self._description is None:
+            self._description = ", ".join(self.items)
+        return self._description
+
+    # Copy of the meal that can be changed without touching this one
+    def clone(self):
+        meal = Meal.__new__(Meal)
+        meal.items = self.items.copy()
+        meal.line_items = self.line_items.copy()
+        meal.price = self.price
+        meal.prices = self.prices
+        meal._description = self._description
+        return meal
 
 
 # Abstract Builder
 class MealBuilder(ABC):
+    # Start a new, empty meal
+    @abstractmethod
+    def reset(self):
+        pass
+
     @abstractmethod
     def add_main_course(self):
         pass
@@ -30,8 +61,12 @@ class MealBuilder(ABC):
 
 # Concrete Builder for a Combo Meal
 class ComboMealBuilder(MealBuilder):
-    def __init__(self):
-        self.meal = Meal()
+    def __init__(self, prices=MENU_PRICES):
+        self.prices = prices
+        self.reset()
+
+    def reset(self):
+        self.meal = Meal(self.prices)
 
     def add_main_course(self):
         self.meal.add_item("Burger")
@@ -46,13 +81,68 @@ class ComboMealBuilder(MealBuilder):
         return self.meal
 
 
-# Director class that builds a meal
+# Director class that builds a meal; every construction starts from a new meal
 class MealDirector:
     def __init__(self, builder):
         self.builder = builder
 
     def construct_meal(self):
+        self.builder.reset()
         self.builder.add_main_course()
         self.builder.add_drink()
         self.builder.add_dessert()
         return self.builder.get_meal()
+
+
+# Combo built once by the director; new meals are clones of it and orders get
+# its precomputed line items, so no builder runs per meal or per order
+class ComboTemplate:
+    def __init__(self, name, builder):
+        self.name = name
+        self.meal = MealDirector(builder).construct_meal()
+        self.line_items = tuple(self.meal.line_items)
+        self.price = self.meal.price
+        self.description = self.meal.show_items()
+
+    def instantiate(self):
+        return self.meal.clone()
+
+    # Line items of quantity combos
+    def order_items(self, quantity=1):
+        if quantity == 1:
+            return list(self.line_items)
+        return [(item, count * quantity, price) for item, count, price in self.line_items]
+
+    # Add quantity combos to the order as priced line items
+    def add_to_order(self, order, quantity=1):
+        if not hasattr(order, "items"):
+            order.items = []
+        order.items.extend(self.order_items(quantity))
+
+
+# Registry of prebuilt combos by name
+COMBO_TEMPLATES = {}
+
+
+def register_combo(name, builder):
+    template = ComboTemplate(name, builder)
+    COMBO_TEMPLATES[name] = template
+    return template
+
+
+def get_combo(name):
+    try:
+        return COMBO_TEMPLATES[name]
+    except KeyError:
+        raise ValueError(f"Unknown combo: {name}") from None
+
+
+# n meals of a template (a ComboTemplate or a registered combo name)
+def construct_meals(n, template):
+    if isinstance(template, str):
+        template = get_combo(template)
+    meal = template.meal
+    return [meal.clone() for _ in range(n)]
+
+
+register_combo("Combo", ComboMealBuilder())
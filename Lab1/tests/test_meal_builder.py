@@ -0,0 +1,51 @@
+import importlib.util
+import os
+
+import pytest
+
+# Lab1 shares module names with the other labs, so the module is loaded from its
+# path under its own name instead of through sys.path
+_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "meal_builder.py")
+_spec = importlib.util.spec_from_file_location("lab1_meal_builder", _path)
+meal_builder = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(meal_builder)
+
+
+def test_unknown_item_without_price_raises():
+    meal = meal_builder.Meal()
+    with pytest.raises(ValueError, match="Caviar"):
+        meal.add_item("Caviar")
+    assert meal.items == [] and meal.price == 0
+    meal.add_item("Caviar", 99)
+    assert meal.line_items == [("Caviar", 1, 99)]
+
+
+def test_builder_prices():
+    builder = meal_builder.ComboMealBuilder({"Burger": 5, "Soda": 1, "Ice Cream": 2})
+    meal = meal_builder.MealDirector(builder).construct_meal()
+    assert meal.price == 8
+    with pytest.raises(ValueError):
+        meal_builder.MealDirector(meal_builder.ComboMealBuilder({"Burger": 5})).construct_meal()
+
+
+def test_director_starts_every_meal_empty():
+    director = meal_builder.MealDirector(meal_builder.ComboMealBuilder())
+    first = director.construct_meal()
+    second = director.construct_meal()
+    assert first is not second
+    assert first.items == second.items == ["Burger", "Soda", "Ice Cream"]
+    assert second.price == pytest.approx(8.5 + 1.99 + 3.8)
+
+
+def test_combo_template_clones_and_order_items():
+    template = meal_builder.ComboTemplate("Test", meal_builder.ComboMealBuilder())
+    meals = meal_builder.construct_meals(3, template)
+    meals[0].add_item("Soda")
+    assert template.meal.items == ["Burger", "Soda", "Ice Cream"]
+    assert meals[1].show_items() == "Burger, Soda, Ice Cream"
+    assert template.order_items(2) == [("Burger", 2, 8.5), ("Soda", 2, 1.99), ("Ice Cream", 2, 3.8)]
+
+
+def test_unknown_combo_raises():
+    with pytest.raises(ValueError):
+        meal_builder.get_combo("Nope")
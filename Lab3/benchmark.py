@@ -0,0 +1,398 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+from order_manager import OrderManager
+from order_adapter import OrderAdapter
+from observer import LoggingObserver, ReportGeneratorObserver
+from cost_calculator import RegularCostCalculator, DiscountedCostCalculator
+from cost_decorator import TaxDecorator, ServiceChargeDecorator, compile_pricing
+from report_generator import TextReportGenerator, HTMLReportGenerator
+from promotions import PromotionCalculator, ItemDiscount, BuyXGetY, ComboBundle, HappyHour
+from sales_aggregates import SalesAggregatesObserver
+from sharded_orders import ShardedOrderSystem
+from system_facade import SystemFacade
+
+MENU = [("Burger", 8.5), ("Pizza", 12.5), ("Pasta", 10.25), ("Salad", 6.75), ("Soup", 4.5),
+        ("Steak", 21.0), ("Fries", 3.25), ("Soda", 1.99), ("Coffee", 2.4), ("Ice Cream", 3.8)]
+
+DEFAULT_TOLERANCE = 0.20  # allowed throughput drop before a stage counts as a regression
+
+
+# Synthetic external orders (the OrderAdapter input format)
+def generate_orders(order_count=10000, items_per_order=5, dine_in_ratio=0.5, seed=42):
+    rng = random.Random(seed)
+    orders = []
+    for order_id in range(order_count):
+        dine_in = rng.random() < dine_in_ratio
+        items = []
+        for _ in range(items_per_order):
+            name, price = rng.choice(MENU)
+            items.append({"name": name, "quantity": rng.randint(1, 4), "price": price})
+        orders.append({
+            "id": order_id,
+            "customer_name": f"Customer {rng.randrange(order_count // 10 + 1)}",
+            "order_type": "dine-in" if dine_in else "takeaway",
+            "table_number": rng.randint(1, 40) if dine_in else None,
+            "items": items,
+        })
+    return orders
+
+
+# Internal orders built through the factories, not yet added to OrderManager
+def build_orders(external_orders):
+    orders = []
+    for external in external_orders:
+        if external["order_type"] == "dine-in":
+            order = DineInOrderFactory(external["table_number"]).create_order(external["id"], external["customer_name"])
+        else:
+            order = TakeawayOrderFactory().create_order(external["id"], external["customer_name"])
+        order.items = [(item["name"], item["quantity"], item["price"]) for item in external["items"]]
+        orders.append(order)
+    return orders
+
+
+# Best wall time of several runs; setup runs before each timed call and is not measured
+def best_time(function, setup=None, repeat=3):
+    best = None
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_suite(order_count=10000, items_per_order=5, dine_in_ratio=0.5, repeat=3, seed=42):
+    external_orders = generate_orders(order_count, items_per_order, dine_in_ratio, seed)
+    manager = OrderManager()
+    stages = {}
+
+    def record(name, operations, seconds):
+        stages[name] = {"operations": operations, "seconds": seconds, "throughput": operations / seconds}
+
+    record("factory", order_count, best_time(lambda _: build_orders(external_orders), repeat=repeat))
+    record("adapter", order_count, best_time(
+        lambda _: [OrderAdapter(external).to_internal_order() for external in external_orders], repeat=repeat))
+
+    # add_order with the two standard observers, their output discarded
+    saved_observers = manager.observers
+    manager.observers = [LoggingObserver(), ReportGeneratorObserver()]
+
+    def add_orders(orders):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for order in orders:
+                manager.add_order(order)
+
+    def fresh_orders():
+        manager.clear()
+        return build_orders(external_orders)
+
+    try:
+        record("add_order", order_count, best_time(add_orders, fresh_orders, repeat))
+    finally:
+        manager.observers = saved_observers
+    orders = list(manager.orders)
+
+    calculators = {
+        "regular": RegularCostCalculator(),
+        "discounted": DiscountedCostCalculator(10),
+        "tax_service": ServiceChargeDecorator(TaxDecorator(RegularCostCalculator(), 8), 2.5),
+    }
+    # Every timed pricing run starts from orders without a memoized subtotal, so
+    # it measures summing the items too, not just the cached lookups
+    def cold_orders():
+        for order in orders:
+            order.invalidate_subtotal()
+        return orders
+
+    for name, calculator in calculators.items():
+        record(f"pricing_{name}", order_count, best_time(
+            lambda orders: [calculator.calculate_total(order) for order in orders], cold_orders, repeat))
+        record(f"pricing_{name}_batch", order_count, best_time(
+            lambda orders: calculator.calculate_totals(orders), cold_orders, repeat))
+
+    for name, generator in (("text", TextReportGenerator()), ("html", HTMLReportGenerator())):
+        record(f"report_{name}", order_count, best_time(
+            lambda _: [generator.generate_report(order, 0) for order in orders], repeat=repeat))
+
+    manager.clear()
+    return {
+        "config": {"order_count": order_count, "items_per_order": items_per_order,
+                   "dine_in_ratio": dine_in_ratio, "repeat": repeat, "seed": seed},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "stages": stages,
+    }
+
+
+# Stages whose throughput fell below the baseline by more than the tolerance.
+# The baseline file may carry per-stage tolerances under "tolerances".
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    tolerances = baseline.get("tolerances", {})
+    regressions = []
+    for name, expected in baseline["stages"].items():
+        current = results["stages"].get(name)
+        if current is None:
+            continue
+        allowed = tolerances.get(name, tolerance)
+        ratio = current["throughput"] / expected["throughput"]
+        if ratio < 1 - allowed:
+            regressions.append((name, ratio, allowed))
+    return regressions
+
+
+# Build a small order that is priced over and over
+def make_order(item_count=5):
+    order = TakeawayOrderFactory().create_order(1, "Benchmark")
+    order.items = [(f"Item {i}", random.randint(1, 4), round(random.uniform(1, 30), 2)) for i in range(item_count)]
+    return order
+
+
+# Decorator chain of the given depth, alternating tax and service charge
+def make_chain(depth):
+    calculator = RegularCostCalculator()
+    for level in range(depth):
+        if level % 2 == 0:
+            calculator = TaxDecorator(calculator, 5)
+        else:
+            calculator = ServiceChargeDecorator(calculator, 1.5)
+    return calculator
+
+
+# Nested decorator calls vs the compiled pricing function at chain depths 1 to 10
+def benchmark_pricing_chains(max_depth=10, number=100000):
+    order = make_order()
+    results = []
+    for depth in range(1, max_depth + 1):
+        chain = make_chain(depth)
+        price = compile_pricing(chain)
+        assert price(order) == chain.calculate_total_cents(order)
+
+        nested = min(timeit.repeat(lambda: chain.calculate_total_cents(order), number=number, repeat=3))
+        compiled = min(timeit.repeat(lambda: price(order), number=number, repeat=3))
+        results.append((depth, nested / number * 1e9, compiled / number * 1e9))
+    return results
+
+
+# Resident bytes per order (including its line items), measured with tracemalloc
+def measure_order_memory(order_count=100000, item_count=3):
+    factories = [DineInOrderFactory(7), TakeawayOrderFactory()]
+    menu = [(f"Item {i}", 2, 4.5 + i) for i in range(item_count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    orders = []
+    for order_id in range(order_count):
+        order = factories[order_id % 2].create_order(order_id, "Customer")
+        order.items = [(name, quantity, price) for name, quantity, price in menu]
+        orders.append(order)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / order_count
+
+
+# Promotion rules over a menu of menu_size items: item discounts, buy-X-get-Y,
+# two-item bundles and happy hours, in equal shares
+def make_promotions(rule_count, menu_size=500, seed=42):
+    rng = random.Random(seed)
+    names = [f"Item {i}" for i in range(menu_size)]
+    rules = []
+    for index in range(rule_count):
+        kind = index % 4
+        if kind == 0:
+            rules.append(ItemDiscount(rng.choice(names), percentage=rng.choice((5, 10, 15))))
+        elif kind == 1:
+            rules.append(BuyXGetY(rng.choice(names), rng.randint(1, 3)))
+        elif kind == 2:
+            rules.append(ComboBundle({name: 1 for name in rng.sample(names, 2)}, rng.uniform(5, 20)))
+        else:
+            hour = rng.randrange(24)
+            rules.append(HappyHour(f"{hour}:00", f"{(hour + 2) % 24}:00", 10, rng.sample(names, 5)))
+    return names, rules
+
+
+# Orders per second priced by PromotionCalculator, per order and in batch, for each rule count
+def benchmark_promotions(rule_counts=(10, 100, 1000, 5000), order_count=10000, items_per_order=5, seed=42):
+    results = []
+    for rule_count in rule_counts:
+        names, rules = make_promotions(rule_count, seed=seed)
+        rng = random.Random(seed)
+        orders = []
+        for order_id in range(order_count):
+            order = TakeawayOrderFactory().create_order(order_id, "Benchmark")
+            order.items = [(rng.choice(names), rng.randint(1, 4), rng.choice((2.5, 4.75, 8.0, 12.5)))
+                           for _ in range(items_per_order)]
+            orders.append(order)
+        calculator = PromotionCalculator(rules, at="18:30")
+        single = best_time(lambda _: [calculator.calculate_total_cents(order) for order in orders])
+        batch = best_time(lambda _: calculator.calculate_totals_cents(orders))
+        results.append((rule_count, order_count / single, order_count / batch))
+    return results
+
+
+# Concurrent intake: every order is submitted by two threads, so exactly one of
+# the two add_order calls must succeed. Returns (threads, orders/s) and raises
+# AssertionError when an order was lost, stored twice or missed by the observer.
+def stress_concurrent_intake(thread_counts=(1, 2, 4, 8, 16, 32), order_count=20000, items_per_order=5, seed=42):
+    external_orders = generate_orders(order_count, items_per_order, seed=seed)
+    manager = OrderManager()
+    saved_observers = manager.observers
+    results = []
+    try:
+        for thread_count in thread_counts:
+            manager.clear()
+            aggregates = SalesAggregatesObserver()
+            manager.observers = [aggregates]
+            # Thread t submits its own share of the orders and then the share of thread t + 1
+            shares = [build_orders(external_orders[t::thread_count]) for t in range(thread_count)]
+            duplicates = [build_orders(external_orders[t::thread_count]) for t in range(thread_count)]
+            accepted = [0] * thread_count
+            rejected = [0] * thread_count
+            barrier = threading.Barrier(thread_count + 1)
+
+            def intake(t):
+                barrier.wait()
+                for orders in (shares[t], duplicates[(t + 1) % thread_count]):
+                    for order in orders:
+                        try:
+                            manager.add_order(order)
+                            accepted[t] += 1
+                        except ValueError:
+                            rejected[t] += 1
+
+            threads = [threading.Thread(target=intake, args=(t,)) for t in range(thread_count)]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            ids = [order.order_id for order in manager.orders]
+            assert sum(accepted) == order_count and sum(rejected) == order_count, (accepted, rejected)
+            assert len(ids) == order_count and len(set(ids)) == order_count, "lost or duplicated orders"
+            assert sorted(ids) == list(range(order_count)), "unexpected order ids"
+            assert aggregates.order_count == order_count, "observer missed notifications"
+            assert aggregates.verify(manager.orders), "observer aggregates out of date"
+            results.append((thread_count, 2 * order_count / elapsed))
+    finally:
+        manager.observers = saved_observers
+        manager.clear()
+    return results
+
+
+# Intake throughput (orders per second) of one in-process SystemFacade (0 shards)
+# against ShardedOrderSystem. Worker start-up is not timed; the shards only run
+# in parallel up to the number of free cores.
+def benchmark_sharded_intake(shard_counts=(1, 2, 4), order_count=20000, items_per_order=5, seed=42):
+    calls = [OrderAdapter(external).to_order_arguments()
+             for external in generate_orders(order_count, items_per_order, seed=seed)]
+    manager = OrderManager()
+    saved_observers = manager.observers
+    try:
+        manager.clear()
+        facade = SystemFacade()
+        # Like the shard workers: aggregates and rankings, no logging
+        manager.observers = [observer for observer in manager.observers
+                             if not isinstance(observer, (LoggingObserver, ReportGeneratorObserver))]
+        start = time.perf_counter()
+        for arguments in calls:
+            facade.create_order(*arguments)
+        results = [(0, order_count / (time.perf_counter() - start))]
+    finally:
+        manager.observers = saved_observers
+        manager.clear()
+
+    for shard_count in shard_counts:
+        with ShardedOrderSystem(shards=shard_count) as system:
+            start = time.perf_counter()
+            system.create_orders(calls)
+            elapsed = time.perf_counter() - start
+            assert system.order_count() == order_count, "lost orders"
+        results.append((shard_count, order_count / elapsed))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the order pipeline")
+    parser.add_argument("--orders", type=int, default=10000, help="number of synthetic orders")
+    parser.add_argument("--items", type=int, default=5, help="line items per order")
+    parser.add_argument("--dine-in-ratio", type=float, default=0.5, help="share of dine-in orders")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage, the best one is kept")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a results file saved earlier")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed throughput drop against the baseline (0.2 = 20%%)")
+    parser.add_argument("--chains", action="store_true", help="compare nested and compiled pricing chains")
+    parser.add_argument("--memory", action="store_true", help="measure memory per order")
+    parser.add_argument("--promotions", action="store_true",
+                        help="price orders with 10 to 5000 promotion rules")
+    parser.add_argument("--threads", action="store_true",
+                        help="stress concurrent add_order with 1 to 32 intake threads")
+    parser.add_argument("--shards", action="store_true",
+                        help="compare in-process intake with 1, 2 and 4 shard processes")
+    args = parser.parse_args(argv)
+
+    if args.chains:
+        print("Pricing chain depth: nested decorators vs compiled function (ns per call)")
+        for depth, nested, compiled in benchmark_pricing_chains():
+            print(f"depth {depth:2d}: nested {nested:8.0f}  compiled {compiled:8.0f}  speedup x{nested / compiled:.2f}")
+        return 0
+    if args.memory:
+        for item_count in (0, 3, 10):
+            print(f"Memory per order with {item_count} line items: {measure_order_memory(item_count=item_count):.0f} bytes")
+        return 0
+    if args.promotions:
+        print("Promotion pricing (orders per second)")
+        for rule_count, single, batch in benchmark_promotions(order_count=args.orders, items_per_order=args.items,
+                                                              seed=args.seed):
+            print(f"{rule_count:5d} rules: per order {single:12,.0f}  batch {batch:12,.0f}")
+        return 0
+    if args.threads:
+        print(f"Concurrent intake of {args.orders} orders, each submitted twice (add_order calls per second)")
+        for thread_count, throughput in stress_concurrent_intake(order_count=args.orders, items_per_order=args.items,
+                                                                 seed=args.seed):
+            print(f"{thread_count:2d} threads: {throughput:12,.0f} calls/s  no lost or duplicated orders")
+        return 0
+
+    if args.shards:
+        print(f"Sharded intake of {args.orders} orders on {os.cpu_count()} CPU(s) (orders per second)")
+        for shard_count, throughput in benchmark_sharded_intake(order_count=args.orders, items_per_order=args.items,
+                                                                seed=args.seed):
+            label = "in-process" if shard_count == 0 else f"{shard_count} shards"
+            print(f"{label:>10s}: {throughput:12,.0f} orders/s")
+        return 0
+
+    results = run_suite(args.orders, args.items, args.dine_in_ratio, args.repeat, args.seed)
+    for name, stage in results["stages"].items():
+        print(f"{name:28s} {stage['throughput']:14,.0f} ops/s  ({stage['seconds'] * 1000:.1f} ms)")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for name, ratio, allowed in regressions:
+            print(f"REGRESSION {name}: {ratio:.0%} of baseline throughput (tolerance {allowed:.0%})")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,85 @@
 from abc import ABC, abstractmethod
+from operator import mul
+
+from line_item_store import LineItemsView
+from money import CENTS, percent_of, rate_units
+
+# Subtotal of a single order in cents: sum of quantity * price_per_item, cached on the order
+def calculate_subtotal_cents(order):
+    return order.subtotal_cents
+
+# Subtotals in cents of many orders at once. Cached subtotals are reused; the
+# remaining orders backed by the columnar line item store are priced run by run:
+# views whose rows follow each other in the store are multiplied in one pass, so
+# the work grows with the rows of the batch, not with the distance between them.
+def calculate_subtotals_cents(orders):
+    subtotals = [order.cached_subtotal_cents for order in orders]
+    pending = {}  # store -> (start, count, position in orders) of its views left to price
+    for position, order in enumerate(orders):
+        if subtotals[position] is None:
+            items = order.items
+            if isinstance(items, LineItemsView):
+                pending.setdefault(items.store, []).append((items.start, items.count, position))
+            else:
+                subtotals[position] = order.subtotal_cents
+
+    for store, views in pending.items():
+        views.sort()
+        quantities, price_cents = store.quantities, store.price_cents
+        first = 0
+        while first < len(views):
+            low = views[first][0]
+            high = low + views[first][1]
+            last = first + 1
+            while last < len(views) and views[last][0] == high:
+                high += views[last][1]
+                last += 1
+            products = list(map(mul, quantities[low:high], price_cents[low:high]))
+            for start, count, position in views[first:last]:
+                offset = start - low
+                subtotals[position] = sum(products[offset:offset + count])
+            first = last
+    return subtotals
 
 # Abstract Class for Cost Calculation
 class CostCalculator(ABC):
+    # Exact total in integer cents
     @abstractmethod
-    def calculate_total(self, order):
+    def calculate_total_cents(self, order):
         pass
 
+    def calculate_total(self, order):
+        return self.calculate_total_cents(order) / CENTS
+
+    # Batch pricing: totals for many orders, identical to pricing each one
+    def calculate_totals_cents(self, orders):
+        return [self.calculate_total_cents(order) for order in orders]
+
+    def calculate_totals(self, orders):
+        return [total / CENTS for total in self.calculate_totals_cents(orders)]
+
 # Regular Cost Calculation
 class RegularCostCalculator(CostCalculator):
-    def calculate_total(self, order):
-        total = 0
-        for item in order.items:
-            total += item[1] * item[2]  # quantity * price_per_item
-        return total
+    def calculate_total_cents(self, order):
+        return calculate_subtotal_cents(order)
+
+    def calculate_totals_cents(self, orders):
+        return calculate_subtotals_cents(orders)
 
 # Discounted Cost Calculation
 class DiscountedCostCalculator(CostCalculator):
     def __init__(self, discount_percentage):
         self.discount_percentage = discount_percentage
 
-    def calculate_total(self, order):
-        total = 0
-        for item in order.items:
-            total += item[1] * item[2]
-        discount = total * self.discount_percentage / 100
+    # Discount is rounded to whole cents, see money.percent_of
+    def adjust(self, total):
+        discount = percent_of(total, rate_units(self.discount_percentage))
         return total - discount
+
+    def calculate_total_cents(self, order):
+        return self.adjust(calculate_subtotal_cents(order))
+
+    # The rate is converted once for the whole batch
+    def calculate_totals_cents(self, orders):
+        units = rate_units(self.discount_percentage)
+        return [total - percent_of(total, units) for total in calculate_subtotals_cents(orders)]
@@ -1,27 +1,110 @@
-from cost_calculator import RegularCostCalculator
+from functools import lru_cache
+
+from cost_calculator import RegularCostCalculator, DiscountedCostCalculator, calculate_subtotal_cents
+from money import CENTS, percent_of, rate_units, to_cents
 
 class OrderCostDecorator:
     def __init__(self, calculator):
         self.calculator = calculator
 
+    # Adjustment in cents this decorator applies on top of the wrapped calculator's total
+    def adjust(self, total):
+        return total
+
+    # Expression template and value used when the chain is compiled, see compile_pricing
+    def pricing_step(self):
+        return ("{}(total)", self.adjust)
+
+    def calculate_total_cents(self, order):
+        return self.adjust(self.calculator.calculate_total_cents(order))
+
     def calculate_total(self, order):
-        return self.calculator.calculate_total(order)
+        return self.calculate_total_cents(order) / CENTS
+
+    # adjust with the rates and charges converted once, for a batch of totals
+    def batch_adjust(self):
+        return self.adjust
+
+    # Batch pricing: the wrapped calculator prices all orders first, then each
+    # decorator applies its adjustment over the whole list of totals
+    def calculate_totals_cents(self, orders):
+        return list(map(self.batch_adjust(), self.calculator.calculate_totals_cents(orders)))
+
+    def calculate_totals(self, orders):
+        return [total / CENTS for total in self.calculate_totals_cents(orders)]
 
 class TaxDecorator(OrderCostDecorator):
     def __init__(self, calculator, tax_rate):
         super().__init__(calculator)
         self.tax_rate = tax_rate
 
-    def calculate_total(self, order):
-        total = super().calculate_total(order)
-        tax = total * self.tax_rate / 100
+    # Tax is rounded to whole cents, see money.percent_of
+    def adjust(self, total):
+        tax = percent_of(total, rate_units(self.tax_rate))
         return total + tax
 
+    def batch_adjust(self):
+        units = rate_units(self.tax_rate)
+        return lambda total: total + percent_of(total, units)
+
+    def pricing_step(self):
+        return ("total + percent_of(total, {})", rate_units(self.tax_rate))
+
 class ServiceChargeDecorator(OrderCostDecorator):
     def __init__(self, calculator, service_charge):
         super().__init__(calculator)
         self.service_charge = service_charge
 
-    def calculate_total(self, order):
-        total = super().calculate_total(order)
-        return total + self.service_charge
+    def adjust(self, total):
+        return total + to_cents(self.service_charge)
+
+    def batch_adjust(self):
+        charge = to_cents(self.service_charge)
+        return lambda total: total + charge
+
+    def pricing_step(self):
+        return ("total + {}", to_cents(self.service_charge))
+
+# Flatten a decorator chain into a single pricing function returning cents: the
+# base total (the order subtotal for the built-in calculators, the calculator's
+# own total otherwise) followed by every adjustment inlined as one statement,
+# innermost first. Rates and charges are converted once, at compile time. The
+# arithmetic is the same as the nested calculate_total_cents calls, so the
+# result is identical, but pricing costs one call instead of one per decorator.
+def compile_pricing(calculator):
+    steps = []
+    while isinstance(calculator, OrderCostDecorator):
+        steps.append(calculator.pricing_step())
+        calculator = calculator.calculator
+
+    if isinstance(calculator, DiscountedCostCalculator):
+        steps.append(("total - percent_of(total, {})", rate_units(calculator.discount_percentage)))
+        base = calculate_subtotal_cents
+    elif isinstance(calculator, RegularCostCalculator):
+        base = calculate_subtotal_cents
+    else:
+        base = calculator.calculate_total_cents  # other strategies (e.g. promotions) are called as they are
+    steps.reverse()
+
+    namespace = {"base_total": base, "percent_of": percent_of}
+    lines = ["def price(order):", "    total = base_total(order)"]
+    for index, (expression, value) in enumerate(steps):
+        name = f"value_{index}"
+        namespace[name] = value
+        lines.append(f"    total = {expression.format(name)}")
+    lines.append("    return total")
+    exec("\n".join(lines), namespace)
+    return namespace["price"]
+
+# Compiled pricing function (in cents) for a pricing configuration, built once and reused
+@lru_cache(maxsize=128)
+def cached_pricing(tax_rate=0, service_charge=0, discount_percentage=0):
+    if discount_percentage > 0:
+        calculator = DiscountedCostCalculator(discount_percentage)
+    else:
+        calculator = RegularCostCalculator()
+    if tax_rate > 0:
+        calculator = TaxDecorator(calculator, tax_rate)
+    if service_charge > 0:
+        calculator = ServiceChargeDecorator(calculator, service_charge)
+    return compile_pricing(calculator)
@@ -0,0 +1,94 @@
+import threading
+from time import perf_counter_ns
+
+# Latency histogram with power-of-two nanosecond buckets: bucket b counts
+# samples in [2^(b-1), 2^b). Recording a sample is one bit_length and one add.
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.buckets[ns.bit_length()] += 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    # Upper bound of the bucket holding the given percentile
+    def percentile(self, percent):
+        if not self.count:
+            return 0
+        rank = self.count * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ns": self.total_ns / self.count if self.count else 0,
+            "min_ns": self.min_ns or 0,
+            "p50_ns": self.percentile(50),
+            "p99_ns": self.percentile(99),
+            "max_ns": self.max_ns,
+        }
+
+
+# Per-stage timings and counters. Callers check `enabled` before taking a
+# timestamp, so disabled instrumentation costs one attribute test per stage.
+# Updates and reads take one lock, so stages recorded from several threads
+# (concurrent add_order, the observer dispatcher) lose no samples.
+class Instrumentation:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def now(self):
+        return perf_counter_ns()
+
+    def record(self, stage, start_ns):
+        elapsed = perf_counter_ns() - start_ns
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(elapsed)
+
+    def increment(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def _summaries(self):
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}, dict(self.counters)
+
+    def stats(self):
+        stages, counters = self._summaries()
+        return {"enabled": self.enabled, "stages": stages, "counters": counters}
+
+    # Plain-text snapshot, one line per stage and counter
+    def snapshot(self):
+        stages, counters = self._summaries()
+        lines = []
+        for stage, summary in sorted(stages.items()):
+            lines.append(f"stage {stage} count={summary['count']} mean_ns={summary['mean_ns']:.0f} "
+                         f"p50_ns={summary['p50_ns']} p99_ns={summary['p99_ns']} max_ns={summary['max_ns']}")
+        for counter, value in sorted(counters.items()):
+            lines.append(f"counter {counter} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,228 @@
+import threading
+from array import array
+from operator import index, mul
+
+from menu_catalog import MenuCatalog
+from money import CENTS, to_cents
+from order import LineItem
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+# Quantity as an int that fits the columns; a float is accepted when it holds a whole number
+def _whole_quantity(quantity):
+    if type(quantity) is not int:
+        if isinstance(quantity, float) and quantity.is_integer():
+            quantity = int(quantity)
+        else:
+            try:
+                quantity = index(quantity)
+            except TypeError:
+                raise ValueError(f"Quantity must be a whole number, got {quantity!r}") from None
+    if not _INT64_MIN <= quantity <= _INT64_MAX:
+        raise ValueError(f"Quantity out of range: {quantity}")
+    return quantity
+
+# Columnar storage for the line items of every order held by OrderManager.
+# Each column is a contiguous typed array; row i describes one line item.
+# Every change to the columns is made under self.lock: appending an order and
+# editing one (which may move its rows to the end) both depend on the column
+# length staying put. OrderManager passes its store lock, so the journal write
+# and the append of an order are covered by the same lock.
+class LineItemStore:
+    def __init__(self, catalog=None, lock=None):
+        self.lock = lock if lock is not None else threading.RLock()
+        self.order_indexes = array("q")  # position of the order in OrderManager.orders
+        self.item_ids = array("q")       # menu catalog item id, see item_names
+        self.quantities = array("q")
+        self.price_cents = array("q")    # unit price in integer cents
+
+        self.catalog = catalog if catalog is not None else MenuCatalog()
+        self.item_names = self.catalog.item_names  # item id -> item name
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def intern_item(self, name):
+        return self.catalog.intern(name)
+
+    # Append the items of one order and return a view over the stored rows.
+    # All items are checked before the first row is written, so a bad item
+    # rejects the whole order with ValueError and leaves the columns as they were.
+    def add_items(self, order_index, items):
+        return self.add_rows(order_index, self.convert_items(items))
+
+    # (item id, quantity, unit price in cents) rows of (name, quantity, price) items
+    def convert_items(self, items):
+        return [self._convert(item) for item in items]
+
+    def _convert(self, item):
+        name, quantity, price = item
+        quantity = _whole_quantity(quantity)
+        cents = to_cents(price)
+        if not _INT64_MIN <= cents <= _INT64_MAX:
+            raise ValueError(f"Price out of range: {price}")
+        return self.intern_item(name), quantity, cents
+
+    # Append converted rows of one order and return a view over them
+    def add_rows(self, order_index, rows):
+        with self.lock:
+            start = len(self.item_ids)
+            if rows:
+                item_ids, quantities, price_cents = zip(*rows)
+                self.item_ids.extend(item_ids)
+                self.quantities.extend(quantities)
+                self.price_cents.extend(price_cents)
+                self.order_indexes.extend(array("q", [order_index]) * len(rows))
+        return LineItemsView(self, start, len(rows), order_index)
+
+    # Rows no longer referenced by any order keep a zero quantity so that
+    # whole-day scans can run over the columns without checking liveness
+    def _release_rows(self, start, stop):
+        for index in range(start, stop):
+            self.order_indexes[index] = -1
+            self.quantities[index] = 0
+
+    def append_item(self, view, item):
+        item_id, quantity, cents = self._convert(item)
+        with self.lock:
+            stop = view.start + view.count
+            if stop != len(self.item_ids):
+                # Not the last segment: move the order's rows to the end of the store first
+                new_start = len(self.item_ids)
+                for column in (self.item_ids, self.quantities, self.price_cents):
+                    column.extend(column[view.start:stop])
+                self.order_indexes.extend(array("q", [view.order_index]) * view.count)
+                self._release_rows(view.start, stop)
+                view.start = new_start
+            self.order_indexes.append(view.order_index)
+            self.item_ids.append(item_id)
+            self.quantities.append(quantity)
+            self.price_cents.append(cents)
+            view.count += 1
+
+    def set_item(self, view, index, item):
+        row_values = self._convert(item)
+        with self.lock:
+            row = view.start + index
+            self.item_ids[row], self.quantities[row], self.price_cents[row] = row_values
+
+    def delete_item(self, view, index):
+        with self.lock:
+            start = view.start + index
+            stop = view.start + view.count
+            for column in (self.order_indexes, self.item_ids, self.quantities, self.price_cents):
+                column[start:stop - 1] = column[start + 1:stop]
+            if stop == len(self.item_ids):
+                for column in (self.order_indexes, self.item_ids, self.quantities, self.price_cents):
+                    column.pop()
+            else:
+                self._release_rows(stop - 1, stop)
+            view.count -= 1
+
+    def row(self, index):
+        return LineItem(self.item_names[self.item_ids[index]], self.quantities[index], self.price_cents[index] / CENTS)
+
+    # Exact subtotal in cents of the rows behind a view
+    def subtotal_cents(self, view):
+        stop = view.start + view.count
+        return sum(map(mul, self.quantities[view.start:stop], self.price_cents[view.start:stop]))
+
+    # Whole-day scans over the contiguous columns, exact in cents
+    def total_revenue_cents(self):
+        return sum(map(mul, self.quantities, self.price_cents))
+
+    # Items of the catalog that were never sold (or whose rows were released) are left out
+    def revenue_cents_by_item(self):
+        revenue = [0] * len(self.item_names)
+        counts = [0] * len(self.item_names)
+        for item_id, quantity, price in zip(self.item_ids, self.quantities, self.price_cents):
+            revenue[item_id] += quantity * price
+            counts[item_id] += quantity
+        return {self.item_names[item_id]: value for item_id, value in enumerate(revenue) if counts[item_id]}
+
+    def total_revenue(self):
+        return self.total_revenue_cents() / CENTS
+
+    def revenue_by_item(self):
+        return {name: cents / CENTS for name, cents in self.revenue_cents_by_item().items()}
+
+    def quantity_by_item(self):
+        counts = [0] * len(self.item_names)
+        for item_id, quantity in zip(self.item_ids, self.quantities):
+            counts[item_id] += quantity
+        return {self.item_names[item_id]: value for item_id, value in enumerate(counts) if value}
+
+
+# Sequence of LineItem (name, quantity, price) tuples backed by a LineItemStore.
+# Read-only as a sequence: the items of a stored order are changed through
+# Order.add_item, update_item and remove_item, which keep the order's cached
+# subtotal and version in step and call the *_item methods below.
+class LineItemsView:
+    __slots__ = ("store", "start", "count", "order_index")
+
+    def __init__(self, store, start, count, order_index):
+        self.store = store
+        self.start = start
+        self.count = count
+        self.order_index = order_index
+
+    def _check_index(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("line item index out of range")
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        return self.store.row(self.start + self._check_index(index))
+
+    def set_item(self, index, item):
+        self.store.set_item(self, self._check_index(index), item)
+
+    def delete_item(self, index):
+        self.store.delete_item(self, self._check_index(index))
+
+    def append_item(self, item):
+        self.store.append_item(self, item)
+
+    def subtotal_cents(self):
+        return self.store.subtotal_cents(self)
+
+    def __iter__(self):
+        store = self.store
+        names = store.item_names
+        stop = self.start + self.count
+        for item_id, quantity, price in zip(store.item_ids[self.start:stop],
+                                            store.quantities[self.start:stop],
+                                            store.price_cents[self.start:stop]):
+            yield LineItem(names[item_id], quantity, price / CENTS)
+
+    # (item id, quantity, unit price in cents) rows, names left unresolved
+    def rows(self):
+        stop = self.start + self.count
+        return list(zip(self.store.item_ids[self.start:stop],
+                        self.store.quantities[self.start:stop],
+                        self.store.price_cents[self.start:stop]))
+
+    # (name, quantity, unit price in cents) straight from the columns
+    def iter_cents(self):
+        names = self.store.item_names
+        stop = self.start + self.count
+        return zip(map(names.__getitem__, self.store.item_ids[self.start:stop]),
+                   self.store.quantities[self.start:stop],
+                   self.store.price_cents[self.start:stop])
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
@@ -1,3 +1,10 @@
+import argparse
+import os
+import sys
+import time
+
+from observer import LoggingObserver, ReportGeneratorObserver
+from order_adapter import read_csv_orders, read_external_orders
 from system_facade import SystemFacade
 
 def get_order_details():
@@ -11,20 +18,99 @@ def get_order_details():
         if item_name.lower() == 'done':
             break
         quantity = int(input("Enter quantity: "))
-        price = float(input("Enter price per item: "))
-        items.append((item_name, quantity, price))
+        price = input("Enter price per item: ").strip()
+        if price:
+            items.append((item_name, quantity, float(price)))
+        else:
+            items.append((item_name, quantity))  # menu price
     return order_type, order_id, customer_name, items, table_number
 
-def main():
+def load_menu(facade, path):
+    if path:
+        with open(path, newline="") as file:
+            facade.load_menu(file)
+
+def run_interactive(menu=None):
     facade = SystemFacade()
+    load_menu(facade, menu)
 
     while True:
         order_type, order_id, customer_name, items, table_number = get_order_details()
-        order = facade.create_order(order_type, order_id, customer_name, items, table_number)
-        print(facade.generate_report(order, "text"))
+        try:
+            order = facade.create_order(order_type, order_id, customer_name, items, table_number)
+        except ValueError as error:
+            print(error)
+        else:
+            print(facade.generate_report(order, "text"))
         print("Do you want to add another order? (yes/no): ")
         if input().strip().lower() != "yes":
             break
 
+# Non-interactive mode: read orders from a CSV or JSON lines file (or stdin),
+# add them through the facade in batches and write the reports
+def run_batch(args):
+    facade = SystemFacade()
+    if not args.log_orders:
+        for observer in list(facade.order_manager.observers):
+            if isinstance(observer, (LoggingObserver, ReportGeneratorObserver)):
+                facade.order_manager.remove_observer(observer)
+    load_menu(facade, args.menu)
+
+    input_format = args.input_format
+    if input_format is None:
+        input_format = "csv" if args.batch.lower().endswith(".csv") else "jsonl"
+
+    start = time.perf_counter()
+    stored = len(facade.order_manager.orders)
+    stream = sys.stdin if args.batch == "-" else open(args.batch, newline="" if input_format == "csv" else None)
+    try:
+        feed = read_csv_orders(stream) if input_format == "csv" else read_external_orders(stream)
+        orders = facade.create_orders(feed, args.batch_size)
+    except (KeyError, TypeError, ValueError) as error:
+        added = len(facade.order_manager.orders) - stored
+        reason = f"missing field {error}" if isinstance(error, KeyError) else str(error)
+        print(f"Batch failed: {reason} ({added} orders before it were added; no reports written)", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    loaded = time.perf_counter()
+
+    extension = "html" if args.report == "html" else "txt"
+    if args.output == "-":
+        for order in orders:
+            facade.write_report(order, sys.stdout, args.report)
+    elif args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for order in orders:
+            with open(os.path.join(args.output, f"order_{order.order_id}.{extension}"), "w") as sink:
+                facade.write_report(order, sink, args.report)
+    if args.export:
+        facade.export_orders(args.export, "csv" if args.export.lower().endswith(".csv") else "binary", orders)
+    finished = time.perf_counter()
+
+    elapsed = finished - start
+    print(f"Processed {len(orders)} orders in {elapsed:.2f}s "
+          f"({len(orders) / elapsed if elapsed else 0:,.0f} orders/s; "
+          f"load {loaded - start:.2f}s, reports {finished - loaded:.2f}s)", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Restaurant order management system")
+    parser.add_argument("--batch", metavar="FILE", help="read orders from FILE ('-' for stdin) instead of prompting")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="input format (default: by file extension, jsonl for stdin)")
+    parser.add_argument("--report", choices=["text", "html"], default="text", help="report format")
+    parser.add_argument("--output", metavar="DIR", help="write one report per order into DIR ('-' for stdout)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="orders added per batch")
+    parser.add_argument("--log-orders", action="store_true", help="keep the logging observers in batch mode")
+    parser.add_argument("--export", metavar="FILE", help="also export the orders to FILE (CSV for .csv, binary otherwise)")
+    parser.add_argument("--menu", metavar="FILE", help="CSV menu (name,price) whose prices apply to items given without one")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        return run_batch(args)
+    run_interactive(args.menu)
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import csv
+import threading
+
+from money import CENTS, to_cents
+from order import LineItem
+
+# Menu catalog: every distinct item name is interned once to a small integer id,
+# optionally with a canonical unit price in cents. OrderManager's line item
+# store shares the catalog's ids, so stored rows hold an id instead of a name
+# and per-item grouping works on integers. Names are never forgotten (stored
+# rows refer to their ids), so max_items bounds the catalog when names come from
+# untrusted input, such as network orders.
+class MenuCatalog:
+    def __init__(self, items=(), max_items=None):
+        self.item_names = []     # item id -> item name
+        self.price_cents = []    # item id -> canonical unit price in cents, None when not on the menu
+        self.max_items = max_items  # most names the catalog takes, None for no bound
+        self._item_ids = {}      # item name -> item id
+        self._lock = threading.Lock()
+        for name, price in items:
+            self.add_item(name, price)
+
+    def __len__(self):
+        return len(self.item_names)
+
+    def __contains__(self, name):
+        return name in self._item_ids
+
+    # Id of the name, added without a price when it is new (ValueError when the catalog is full)
+    def intern(self, name):
+        item_id = self._item_ids.get(name)
+        if item_id is None:
+            with self._lock:
+                item_id = self._item_ids.get(name)
+                if item_id is None:
+                    item_id = len(self.item_names)
+                    if self.max_items is not None and item_id >= self.max_items:
+                        raise ValueError(f"Menu catalog is full ({self.max_items} items), cannot add: {name}")
+                    self.item_names.append(name)
+                    self.price_cents.append(None)
+                    self._item_ids[name] = item_id
+        return item_id
+
+    # Put an item on the menu (or change its price) and return its id
+    def add_item(self, name, price):
+        item_id = self.intern(name)
+        self.price_cents[item_id] = to_cents(price)
+        return item_id
+
+    # Whether the item, given by name or id, is on the menu (has a menu price)
+    def on_menu(self, item):
+        item_id = item if type(item) is int else self._item_ids.get(item)
+        return item_id is not None and 0 <= item_id < len(self.price_cents) and self.price_cents[item_id] is not None
+
+    def item_id(self, name):
+        try:
+            return self._item_ids[name]
+        except KeyError:
+            raise ValueError(f"Unknown menu item: {name}") from None
+
+    # Item id of a name or an id
+    def _resolve(self, item):
+        if type(item) is int:
+            if not 0 <= item < len(self.item_names):
+                raise ValueError(f"Unknown menu item id: {item}")
+            return item
+        return self.intern(item)
+
+    def name_of(self, item):
+        return self.item_names[self._resolve(item)]
+
+    def price_cents_of(self, item):
+        item_id = self._resolve(item)
+        price = self.price_cents[item_id]
+        if price is None:
+            raise ValueError(f"No menu price for item: {self.item_names[item_id]}")
+        return price
+
+    def price_of(self, item):
+        return self.price_cents_of(item) / CENTS
+
+    # LineItem of a menu item given by name or id. Without a price the menu price
+    # is used. A name with a price is passed through as it is: the line item store
+    # interns it when the order is added, no need to look it up twice.
+    def line_item(self, item, quantity, price=None):
+        if price is not None and type(item) is str:
+            return LineItem(item, quantity, price)
+        if price is None:
+            item_id = self._resolve(item) if type(item) is int else self.item_id(item)
+            price = self.price_of(item_id)
+        else:
+            item_id = self._resolve(item)
+        return LineItem(self.item_names[item_id], quantity, price)
+
+    # LineItems from (item, quantity) or (item, quantity, price) tuples
+    def build_items(self, items):
+        return [self.line_item(*item) for item in items]
+
+    # (name, quantity, unit price) of stored (item id, quantity, unit price in cents) rows
+    def resolve(self, rows):
+        return CatalogItems(self.item_names, rows)
+
+    def menu(self):
+        return {name: price / CENTS for name, price in zip(self.item_names, self.price_cents) if price is not None}
+
+
+# Menu items from a CSV file with the header name,price
+def read_menu(stream):
+    return [(row["name"], row["price"]) for row in csv.DictReader(stream)]
+
+
+# Line items as (item id, quantity, unit price in cents) rows plus the item
+# names they refer to; names are looked up only when the items are read
+class CatalogItems:
+    __slots__ = ("item_names", "rows")
+
+    def __init__(self, item_names, rows):
+        self.item_names = item_names
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        names = self.item_names
+        for item_id, quantity, price_cents in self.rows:
+            yield LineItem(names[item_id], quantity, price_cents / CENTS)
+
+    def iter_cents(self):
+        names = self.item_names
+        return ((names[item_id], quantity, price_cents) for item_id, quantity, price_cents in self.rows)
+
+    def subtotal_cents(self):
+        return sum(quantity * price_cents for _, quantity, price_cents in self.rows)
@@ -0,0 +1,76 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from math import isfinite
+
+# Money is handled as an integer number of cents (minor units).
+#
+# Rounding rules:
+# - amounts are rounded to whole cents, half away from zero, when they enter the system (to_cents)
+# - percentages keep four decimal places (rate_units) and every percentage of an
+#   amount is rounded to whole cents, half away from zero (percent_of)
+# - everything else (sums, quantities, fixed charges) is exact integer arithmetic
+
+CENTS = 100
+RATE_SCALE = 10000  # rate units per percent
+
+
+# value * scale rounded half away from zero; ValueError for text that is not a
+# finite number (decimal.InvalidOperation would not be caught as a bad input)
+def _scaled(value, scale):
+    try:
+        return int((Decimal(value) * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):  # ValueError: int() of a NaN
+        raise ValueError(f"Not a valid amount: {value!r}") from None
+
+
+# Amount in major units (int, float, str or Decimal) to integer cents
+def to_cents(amount):
+    if type(amount) is int:
+        return amount * CENTS
+    if type(amount) is float:
+        if not isfinite(amount):
+            raise ValueError(f"Not a valid amount: {amount!r}")
+        scaled = amount * CENTS
+        cents = round(scaled)
+        if abs(scaled - cents) < 1e-6:  # fast path: the float already holds a whole number of cents
+            return cents
+        amount = repr(amount)  # shortest decimal form, e.g. 1.005 rather than 1.00499999...
+    return _scaled(amount, CENTS)
+
+
+# Percentage (e.g. 8.25 for 8.25%) to integer rate units
+def rate_units(percent):
+    if type(percent) is int:
+        return percent * RATE_SCALE
+    if type(percent) is float:
+        percent = repr(percent)
+    return _scaled(percent, RATE_SCALE)
+
+
+# Integer division rounded half away from zero
+def divide_half_up(numerator, denominator):
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+# Given rate units of an amount in cents, rounded to whole cents
+def percent_of(cents, units):
+    return divide_half_up(cents * units, CENTS * RATE_SCALE)
+
+
+_CENT_DIGITS = [f"{cents:02d}" for cents in range(CENTS)]
+
+# Cents as a decimal string with two places, e.g. 1230 -> "12.30".
+# Integer formatting only, no Decimal or float formatting involved.
+def format_cents(cents):
+    if cents < 0:
+        units, cents = divmod(-cents, CENTS)
+        return f"-{units}.{_CENT_DIGITS[cents]}"
+    units, cents = divmod(cents, CENTS)
+    return f"{units}.{_CENT_DIGITS[cents]}"
+
+
+# Amount in major units formatted with two decimal places
+def format_amount(amount):
+    return format_cents(to_cents(amount))
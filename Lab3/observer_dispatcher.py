@@ -0,0 +1,107 @@
+import queue
+import threading
+import traceback
+
+# Backpressure policies used when the dispatch queue is full
+BLOCK = "block"              # wait until the consumer frees a slot
+DROP_OLDEST = "drop-oldest"  # discard the oldest pending notification
+ERROR = "error"              # raise queue.Full to the caller of add_order, before the order is stored
+
+_STOP = object()
+
+
+# Delivers observer notifications on a background thread so that add_order only
+# pays for one queue put, however many observers are registered. A single
+# consumer calls the observers in registration order, so every observer sees
+# orders in the order they were added.
+class AsyncObserverDispatcher:
+    # instrumentation: Instrumentation counting the delivered observer callbacks when enabled
+    def __init__(self, get_observers, max_queue_size=1024, policy=BLOCK, instrumentation=None):
+        if policy not in (BLOCK, DROP_OLDEST, ERROR):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.get_observers = get_observers
+        self.instrumentation = instrumentation
+        self.policy = policy
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(max_queue_size)
+        self._reserved = 0  # slots claimed by reserve() and not yet filled by submit()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="observer-dispatcher", daemon=True)
+        self._thread.start()
+
+    # Error policy: claim a queue slot for an order about to be added, so that
+    # a full queue rejects the order (queue.Full) before it is stored rather
+    # than after. True when a slot was claimed; it is filled by
+    # submit(order, reserved=True) or given back with release().
+    def reserve(self):
+        if self.policy != ERROR:
+            return False
+        with self._lock:
+            self._check_capacity()
+            self._reserved += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._reserved:
+                self._reserved -= 1
+
+    def _check_capacity(self):
+        maxsize = self._queue.maxsize
+        if maxsize > 0 and self._queue.qsize() + self._reserved >= maxsize:
+            raise queue.Full
+
+    def submit(self, order, reserved=False):
+        if self.policy == BLOCK:
+            self._queue.put(order)
+        elif self.policy == ERROR:
+            with self._lock:
+                if reserved and self._reserved:
+                    self._reserved -= 1  # the claimed slot is still free: only the consumer takes from the queue
+                else:
+                    self._check_capacity()
+                self._queue.put_nowait(order)
+        else:
+            while True:
+                try:
+                    self._queue.put_nowait(order)
+                    return
+                except queue.Full:
+                    self._drop_oldest()
+
+    def _drop_oldest(self):
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self._queue.task_done()
+        self.dropped += 1
+
+    def _run(self):
+        while True:
+            order = self._queue.get()
+            try:
+                if order is _STOP:
+                    return
+                observers = self.get_observers()  # copy-on-write list, safe to iterate
+                for observer in observers:
+                    try:
+                        observer.update(order)
+                    except Exception:
+                        self.errors += 1
+                        traceback.print_exc()
+                stats = self.instrumentation
+                if stats is not None and stats.enabled:
+                    stats.increment("observer_callbacks", len(observers))
+            finally:
+                self._queue.task_done()
+
+    # Block until every queued notification has been delivered
+    def flush(self):
+        self._queue.join()
+
+    # Deliver what is pending and stop the consumer thread
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
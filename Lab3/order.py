@@ -1,10 +1,120 @@
 from abc import ABC, abstractmethod
+from itertools import count
+from typing import NamedTuple
+
+from money import CENTS, to_cents
+
+# Immutable line item; still indexable as item[0], item[1], item[2]
+class LineItem(NamedTuple):
+    name: str
+    quantity: int
+    price: float
+
+    # Unit price in integer cents, see money.to_cents for the rounding rule
+    @property
+    def price_cents(self):
+        return to_cents(self.price)
+
+# (name, quantity, unit price in cents) of every line item of an order
+def iter_item_cents(order):
+    items = order.items
+    if hasattr(items, "iter_cents"):
+        return items.iter_cents()  # store-backed items, no float round trip
+    return ((item[0], item[1], to_cents(item[2])) for item in items)
+
+# Order versions come from one counter shared by all orders, so a version
+# identifies one state of one order object: a new order reusing an old order's
+# id (e.g. after OrderManager.clear) never shares a version with it
+_next_version = count(1).__next__
 
 # Abstract Order Class
 class Order(ABC):
+    __slots__ = ("order_id", "customer_name", "_items", "_subtotal_cents", "version")
+
     def __init__(self, order_id, customer_name):
         self.order_id = order_id
         self.customer_name = customer_name
+        self._items = []
+        self._subtotal_cents = 0  # cached sum of quantity * price in cents, None when it must be recomputed
+        self.version = _next_version()  # renewed on every change to the items
+
+    @property
+    def items(self):
+        return self._items
+
+    @items.setter
+    def items(self, items):
+        if isinstance(items, list):
+            items = [item if type(item) is LineItem else LineItem(*item) for item in items]
+        self._items = items
+        self._subtotal_cents = None
+        self.version = _next_version()
+
+    # Exact subtotal in cents, kept up to date by the item methods below
+    @property
+    def subtotal_cents(self):
+        if self._subtotal_cents is None:
+            items = self._items
+            if hasattr(items, "subtotal_cents"):
+                total = items.subtotal_cents()  # store-backed items are summed from the columns
+            else:
+                total = 0
+                for item in items:
+                    total += item[1] * to_cents(item[2])
+            self._subtotal_cents = total
+        return self._subtotal_cents
+
+    @property
+    def subtotal(self):
+        return self.subtotal_cents / CENTS
+
+    # Cached subtotal in cents, or None if the items were replaced since it was last computed
+    @property
+    def cached_subtotal_cents(self):
+        return self._subtotal_cents
+
+    # Drop the memoized subtotal; the next read sums the items again
+    def invalidate_subtotal(self):
+        self._subtotal_cents = None
+
+    # Plain lists are changed in place, store-backed items through their store;
+    # the subtotal is adjusted by the items as they were stored
+    def add_item(self, name, quantity, price):
+        items = self._items
+        item = LineItem(name, quantity, price)
+        if type(items) is list:
+            items.append(item)
+        else:
+            items.append_item(item)
+            item = items[-1]
+        if self._subtotal_cents is not None:
+            self._subtotal_cents += item[1] * to_cents(item[2])
+        self.version = _next_version()
+
+    def remove_item(self, index):
+        items = self._items
+        item = items[index]
+        if type(items) is list:
+            del items[index]
+        else:
+            items.delete_item(index)
+        if self._subtotal_cents is not None:
+            self._subtotal_cents -= item[1] * to_cents(item[2])
+        self.version = _next_version()
+
+    def update_item(self, index, quantity=None, price=None):
+        items = self._items
+        item = items[index]
+        updated = item._replace(quantity=item.quantity if quantity is None else quantity,
+                                price=item.price if price is None else price)
+        if type(items) is list:
+            items[index] = updated
+        else:
+            items.set_item(index, updated)
+            updated = items[index]
+        if self._subtotal_cents is not None:
+            self._subtotal_cents += updated[1] * to_cents(updated[2]) - item[1] * to_cents(item[2])
+        self.version = _next_version()
 
     @abstractmethod
     def order_type(self):
@@ -12,6 +122,9 @@ class Order(ABC):
 
 # Concrete DineInOrder Class
 class DineInOrder(Order):
+    __slots__ = ("table_number",)
+    kind = "dine-in"
+
     def __init__(self, order_id, customer_name, table_number):
         super().__init__(order_id, customer_name)
         self.table_number = table_number
@@ -21,6 +134,9 @@ class DineInOrder(Order):
 
 # Concrete TakeawayOrder Class
 class TakeawayOrder(Order):
+    __slots__ = ()
+    kind = "takeaway"
+
     def __init__(self, order_id, customer_name):
         super().__init__(order_id, customer_name)
 
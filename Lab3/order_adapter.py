@@ -1,22 +1,199 @@
+import codecs
+import csv
+import json
+from itertools import chain, islice
+
 from order import DineInOrderFactory, TakeawayOrderFactory
 
 class OrderAdapter:
-    def __init__(self, external_order):
+    # With a menu catalog, items may be given by "item_id" instead of "name" and
+    # may leave out "price" to use the menu price
+    def __init__(self, external_order, catalog=None):
         self.external_order = external_order
+        self.catalog = catalog
+
+    # (order_type, order_id, customer_name, items, table_number), the arguments of SystemFacade.create_order
+    def to_order_arguments(self):
+        external_order = self.external_order
+        order_type = external_order.get("order_type", "takeaway")
+        table_number = external_order.get("table_number", 0) if order_type == "dine-in" else None
+        if self.catalog is None:
+            items = [(item["name"], item["quantity"], item["price"]) for item in external_order["items"]]
+        else:
+            items = [(item["item_id"] if "item_id" in item else item["name"], item["quantity"], item.get("price"))
+                     for item in external_order["items"]]
+        return order_type, external_order["id"], external_order["customer_name"], items, table_number
 
     def to_internal_order(self):
-        order_id = self.external_order["id"]
-        customer_name = self.external_order["customer_name"]
-        items = [(item["name"], item["quantity"], item["price"]) for item in self.external_order["items"]]
-        order_type = self.external_order.get("order_type", "takeaway")
+        order_type, order_id, customer_name, items, table_number = self.to_order_arguments()
 
         if order_type == "dine-in":
-            table_number = self.external_order.get("table_number", 0)
             dine_in_factory = DineInOrderFactory(table_number)
             order = dine_in_factory.create_order(order_id, customer_name)
         else:
             takeaway_factory = TakeawayOrderFactory()
             order = takeaway_factory.create_order(order_id, customer_name)
 
+        if self.catalog is not None:
+            items = self.catalog.build_items(items)
         order.items = items
         return order
+
+
+# Streaming ingestion: feed -> external order dicts -> internal orders -> batches.
+# Every stage is a generator, so only one chunk of the feed and one batch of
+# orders are held in memory at a time.
+
+# Text chunks from a text or binary file-like object (file, pipe, sys.stdin)
+def _read_chunks(stream, chunk_size):
+    decoder = None
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            if decoder is not None:
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    yield tail
+            return
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder("utf-8")()
+            chunk = decoder.decode(chunk)
+        yield chunk
+
+
+# External order dicts from an NDJSON feed or a JSON array feed, read incrementally
+def read_external_orders(stream, chunk_size=64 * 1024):
+    chunks = _read_chunks(stream, chunk_size)
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        if buffer.strip():
+            break
+    if buffer.lstrip().startswith("["):
+        yield from _read_json_array(buffer, chunks)
+    else:
+        yield from _read_ndjson(buffer, chunks)
+
+
+def _read_ndjson(buffer, chunks):
+    for chunk in chain([""], chunks):  # split the lines already in the buffer first
+        buffer += chunk
+        lines = buffer.split("\n")
+        buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def _read_json_array(buffer, chunks):
+    decoder = json.JSONDecoder()
+    position = buffer.index("[") + 1
+    expect_value = True
+    exhausted = False
+
+    while True:
+        # Skip whitespace and separators; refill the buffer when it runs out
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            if buffer[position] == ",":
+                expect_value = True
+            position += 1
+        if position == len(buffer):
+            if exhausted:
+                raise ValueError("Unexpected end of JSON array feed")
+            buffer = buffer[position:]
+            position = 0
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer += chunk
+            continue
+
+        if buffer[position] == "]":
+            return
+        if not expect_value:
+            raise ValueError(f"Expected ',' or ']' in JSON array feed, got {buffer[position]!r}")
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            value, end = None, None
+        # A value that fails to parse or touches the end of the buffer may be cut off
+        if end is None or (end == len(buffer) and not exhausted):
+            chunk = None if exhausted else next(chunks, None)
+            if chunk is None:
+                if end is None:
+                    raise ValueError("Truncated JSON array feed")
+                exhausted = True
+            else:
+                buffer = buffer[position:] + chunk
+                position = 0
+            continue
+
+        yield value
+        position = end
+        expect_value = False
+
+
+# External order dicts from a CSV feed with one row per line item and the header
+# order_id,order_type,customer_name,table_number,item_name,quantity,price.
+# Consecutive rows with the same order_id belong to the same order.
+def read_csv_orders(stream):
+    current = None
+    for row in csv.DictReader(stream):
+        order_id = int(row["order_id"])
+        if current is None or current["id"] != order_id:
+            if current is not None:
+                yield current
+            table_number = (row.get("table_number") or "").strip()
+            current = {
+                "id": order_id,
+                "customer_name": row["customer_name"],
+                "order_type": (row.get("order_type") or "takeaway").strip().lower(),
+                "table_number": int(table_number) if table_number else 0,
+                "items": [],
+            }
+        if row.get("item_name"):
+            item = {"name": row["item_name"], "quantity": int(row["quantity"])}
+            if (row.get("price") or "").strip():
+                item["price"] = float(row["price"])  # left out: the menu price applies
+            current["items"].append(item)
+    if current is not None:
+        yield current
+
+
+# Internal orders from external order dicts. A record that cannot be adapted
+# (a missing field, a wrong type, an unknown menu item) raises ValueError
+# naming its position in the feed and its id.
+def adapt_orders(external_orders, catalog=None):
+    for position, external_order in enumerate(external_orders, 1):
+        try:
+            order = OrderAdapter(external_order, catalog).to_internal_order()
+        except (KeyError, TypeError, ValueError) as error:
+            order_id = external_order.get("id") if isinstance(external_order, dict) else None
+            reason = f"missing field {error}" if isinstance(error, KeyError) else f"{type(error).__name__}: {error}"
+            raise ValueError(f"Order record {position} (id {order_id!r}): {reason}") from error
+        yield order
+
+
+# Lists of at most batch_size items
+def batched(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+# Read a feed of external orders and add them to the order manager in batches
+def ingest_orders(stream, order_manager, batch_size=1000, chunk_size=64 * 1024):
+    count = 0
+    orders = adapt_orders(read_external_orders(stream, chunk_size), order_manager.catalog)
+    for batch in batched(orders, batch_size):
+        order_manager.add_orders(batch)
+        count += len(batch)
+    return count
@@ -0,0 +1,269 @@
+import csv
+import mmap
+import struct
+import sys
+from array import array
+from operator import mul
+
+from line_item_store import LineItemsView
+from money import CENTS, format_cents
+from order import DineInOrderFactory, TakeawayOrderFactory, iter_item_cents
+
+# Bulk export of orders and their line items.
+#
+# CSV: one row per line item with the header read by order_adapter.read_csv_orders,
+# written chunk_rows rows at a time.
+#
+# Binary: a header followed by fixed-width little-endian columns, each padded to
+# 8 bytes, so a loader can map the file and read the columns in place:
+#   order columns (int64): order id, table number, customer index, first item row
+#                          (one extra entry: the total number of item rows)
+#   order kinds (int8)
+#   item columns (int64):  item name index, quantity, unit price in cents
+#   item names, customer names: int64 offsets (one extra entry) and a utf-8 blob
+
+CSV_HEADER = ["order_id", "order_type", "customer_name", "table_number", "item_name", "quantity", "price"]
+
+MAGIC = b"ORDX"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHqqqq")  # magic, version, reserved, orders, item rows, item names, customers
+
+_TAKEAWAY, _DINE_IN = 0, 1
+_NO_TABLE = -(2 ** 63)
+
+
+def export_csv(orders, sink, chunk_rows=10000):
+    writer = csv.writer(sink)
+    writer.writerow(CSV_HEADER)
+    rows = []
+    count = 0
+    for order in orders:
+        table_number = getattr(order, "table_number", None)
+        prefix = (order.order_id, order.kind, order.customer_name, "" if table_number is None else table_number)
+        for name, quantity, price_cents in iter_item_cents(order):
+            rows.append((*prefix, name, quantity, format_cents(price_cents)))
+        if len(rows) >= chunk_rows:
+            writer.writerows(rows)
+            count += len(rows)
+            rows = []
+    writer.writerows(rows)
+    return count + len(rows)
+
+
+def _pad(size):
+    return b"\0" * (-size % 8)
+
+
+def _string_table(strings):
+    data = [string.encode("utf-8") for string in strings]
+    offsets = array("q", [0])
+    position = 0
+    for encoded in data:
+        position += len(encoded)
+        offsets.append(position)
+    return offsets, b"".join(data)
+
+
+# Write the orders to a binary file-like sink and return the number of bytes written.
+# Items of store-backed orders are copied column slice by column slice.
+def export_binary(orders, sink):
+    order_ids = array("q")
+    table_numbers = array("q")
+    customers = array("q")
+    item_starts = array("q")
+    kinds = array("b")
+    item_ids = array("q")
+    quantities = array("q")
+    price_cents = array("q")
+
+    customer_ids = {}
+    item_names = []
+    name_ids = None  # item name -> index, built when an order is not backed by the first store
+    store = None
+    for order in orders:
+        order_ids.append(order.order_id)
+        table_number = getattr(order, "table_number", None)
+        table_numbers.append(_NO_TABLE if table_number is None else table_number)
+        customer = customer_ids.get(order.customer_name)
+        if customer is None:
+            customer = customer_ids[order.customer_name] = len(customer_ids)
+        customers.append(customer)
+        kinds.append(_DINE_IN if order.kind == "dine-in" else _TAKEAWAY)
+        item_starts.append(len(item_ids))
+
+        items = order.items
+        if isinstance(items, LineItemsView) and store is None and name_ids is None:
+            store = items.store
+            item_names = store.item_names
+        if isinstance(items, LineItemsView) and items.store is store:
+            stop = items.start + items.count
+            item_ids.extend(store.item_ids[items.start:stop])
+            quantities.extend(store.quantities[items.start:stop])
+            price_cents.extend(store.price_cents[items.start:stop])
+            continue
+        if name_ids is None:
+            item_names = list(item_names)
+            name_ids = {name: index for index, name in enumerate(item_names)}
+        for name, quantity, cents in iter_item_cents(order):
+            item_id = name_ids.get(name)
+            if item_id is None:
+                item_id = name_ids[name] = len(item_names)
+                item_names.append(name)
+            item_ids.append(item_id)
+            quantities.append(quantity)
+            price_cents.append(cents)
+    item_starts.append(len(item_ids))
+
+    name_offsets, name_data = _string_table(item_names)
+    customer_offsets, customer_data = _string_table(customer_ids)
+    sections = [order_ids, table_numbers, customers, item_starts, kinds, item_ids, quantities, price_cents,
+                name_offsets, name_data, customer_offsets, customer_data]
+    if sys.byteorder != "little":
+        for column in sections:
+            if isinstance(column, array) and column.itemsize > 1:
+                column.byteswap()
+
+    parts = [_HEADER.pack(MAGIC, VERSION, 0, len(order_ids), len(item_ids), len(item_names), len(customer_ids))]
+    for section in sections:
+        data = memoryview(section).cast("B")
+        parts.append(data)
+        parts.append(_pad(len(data)))
+    data = b"".join(parts)
+    sink.write(data)  # one sequential write of the whole file
+    return len(data)
+
+
+def export_orders(orders, path, format="csv"):
+    if format == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as sink:
+            return export_csv(orders, sink)
+    if format == "binary":
+        with open(path, "wb") as sink:
+            return export_binary(orders, sink)
+    raise ValueError(f"Unknown export format: {format}")
+
+
+# Read-only view of a binary export. The file is memory-mapped and every column
+# is a memoryview over the mapping, so nothing is copied or parsed up front;
+# whole-column scans such as total_revenue_cents run straight over the map.
+class OrderArchive:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Not an order export: {path}") from None
+        self._view = memoryview(self._map)
+        if len(self._view) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not an order export: {path}")
+        magic, version, _, order_count, item_count, name_count, customer_count = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not an order export (or an unsupported version): {path}")
+
+        self._offset = _HEADER.size
+        try:
+            self._load_columns(order_count, item_count, name_count, customer_count)
+        except ValueError:
+            self.close()
+            raise ValueError(f"Truncated order export: {path}") from None
+        self._item_names = None
+        self._customer_names = None
+
+    def _load_columns(self, order_count, item_count, name_count, customer_count):
+        self.order_ids = self._column("q", order_count)
+        self.table_numbers = self._column("q", order_count)
+        self.customers = self._column("q", order_count)
+        self.item_starts = self._column("q", order_count + 1)
+        self.kinds = self._column("b", order_count)
+        self.item_ids = self._column("q", item_count)
+        self.quantities = self._column("q", item_count)
+        self.price_cents = self._column("q", item_count)
+        self._name_offsets = self._column("q", name_count + 1)
+        self._name_data = self._column("B", self._name_offsets[-1])
+        self._customer_offsets = self._column("q", customer_count + 1)
+        self._customer_data = self._column("B", self._customer_offsets[-1])
+
+    def _column(self, format, count):
+        size = struct.calcsize(format) * count
+        start = self._offset
+        if start + size > len(self._view):
+            raise ValueError("column runs past the end of the file")
+        self._offset = start + size + (-size % 8)
+        column = self._view[start:start + size].cast(format)
+        if sys.byteorder != "little" and column.itemsize > 1:
+            column = array(format, column)
+            column.byteswap()
+        return column
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.order_ids)
+
+    @staticmethod
+    def _strings(offsets, data):
+        return [str(data[offsets[index]:offsets[index + 1]], "utf-8") for index in range(len(offsets) - 1)]
+
+    # Item names are decoded the first time they are needed
+    @property
+    def item_names(self):
+        if self._item_names is None:
+            self._item_names = self._strings(self._name_offsets, self._name_data)
+        return self._item_names
+
+    @property
+    def customer_names(self):
+        if self._customer_names is None:
+            self._customer_names = self._strings(self._customer_offsets, self._customer_data)
+        return self._customer_names
+
+    # (item name, quantity, unit price in cents) of the order at the given position
+    def items(self, index):
+        start, stop = self.item_starts[index], self.item_starts[index + 1]
+        names = self.item_names
+        return list(zip(map(names.__getitem__, self.item_ids[start:stop]),
+                        self.quantities[start:stop], self.price_cents[start:stop]))
+
+    # Internal order rebuilt from the export, e.g. to add it to an OrderManager
+    def order(self, index):
+        order_id = self.order_ids[index]
+        customer_name = self.customer_names[self.customers[index]]
+        if self.kinds[index] == _DINE_IN:
+            table_number = self.table_numbers[index]
+            factory = DineInOrderFactory(None if table_number == _NO_TABLE else table_number)
+        else:
+            factory = TakeawayOrderFactory()
+        order = factory.create_order(order_id, customer_name)
+        order.items = [(name, quantity, cents / CENTS) for name, quantity, cents in self.items(index)]
+        return order
+
+    def orders(self):
+        for index in range(len(self)):
+            yield self.order(index)
+
+    def total_revenue_cents(self):
+        return sum(map(mul, self.quantities, self.price_cents))
+
+    def revenue_cents_by_item(self):
+        revenue = [0] * (len(self._name_offsets) - 1)
+        for item_id, quantity, cents in zip(self.item_ids, self.quantities, self.price_cents):
+            revenue[item_id] += quantity * cents
+        names = self.item_names
+        return {names[item_id]: value for item_id, value in enumerate(revenue) if value}
+
+    def close(self):
+        # Release the column views before the view of the whole map they were cut from
+        views = [value for value in vars(self).values() if isinstance(value, memoryview)]
+        for view in reversed(views):
+            view.release()
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,169 @@
+import mmap
+import os
+import struct
+import zlib
+
+from money import CENTS
+from order import DineInOrderFactory, TakeawayOrderFactory, iter_item_cents
+
+# fsync policies
+SYNC_ALWAYS = "always"  # fsync after every order: nothing acknowledged is ever lost
+SYNC_GROUP = "group"    # write every order, fsync once per group of group_size orders
+SYNC_NEVER = "never"    # write every order, leave fsync to the operating system
+
+# Record layout: header (payload length, crc32 of payload) followed by the payload
+_HEADER = struct.Struct("<II")
+_ORDER = struct.Struct("<BqqI")   # kind and flags, order id, table number, item count
+_ITEM = struct.Struct("<qq")      # quantity, unit price in cents
+_LENGTH = struct.Struct("<H")     # prefix of utf-8 strings
+
+_TAKEAWAY, _DINE_IN = 0, 1
+_STRING_ID, _STRING_TABLE = 0x02, 0x04  # flags: the id or table is a string after the customer name
+_NO_TABLE = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+# Limits of the record format: order ids and table numbers are int64 or
+# strings, names are strings of at most 65535 utf-8 bytes. Anything else is
+# refused with ValueError before the record is written.
+
+
+def _pack_string(parts, text, what):
+    if type(text) is not str:
+        raise ValueError(f"The journal stores {what} as a string, not {type(text).__name__}: {text!r}")
+    data = text.encode("utf-8")
+    if len(data) > 0xFFFF:
+        raise ValueError(f"The journal stores {what} of at most 65535 bytes, got {len(data)}")
+    parts.append(_LENGTH.pack(len(data)))
+    parts.append(data)
+
+
+def _read_string(payload, offset):
+    (length,) = _LENGTH.unpack_from(payload, offset)
+    offset += _LENGTH.size
+    return str(payload[offset:offset + length], "utf-8"), offset + length
+
+
+# Order id or table number as its int64 field, or as 0 and a string stored after the customer name
+def _split_key(value, what):
+    if type(value) is int:
+        if not _NO_TABLE < value <= _INT64_MAX:
+            raise ValueError(f"The journal stores {what} in 64 bits, got {value}")
+        return value, None
+    if type(value) is str:
+        return 0, value
+    raise ValueError(f"The journal stores {what} as an integer or a string, not {type(value).__name__}: {value!r}")
+
+
+# items: (name, quantity, unit price in cents) of the order's items, read from the order when None
+def encode_order(order, items=None):
+    if items is None:
+        items = list(iter_item_cents(order))
+    flags = _DINE_IN if order.kind == "dine-in" else _TAKEAWAY
+    order_id, string_id = _split_key(order.order_id, "order ids")
+    table_number = getattr(order, "table_number", None)
+    string_table = None
+    if table_number is None:
+        table_number = _NO_TABLE
+    else:
+        table_number, string_table = _split_key(table_number, "table numbers")
+    if string_id is not None:
+        flags |= _STRING_ID
+    if string_table is not None:
+        flags |= _STRING_TABLE
+    parts = [_ORDER.pack(flags, order_id, table_number, len(items))]
+    _pack_string(parts, order.customer_name, "customer names")
+    if string_id is not None:
+        _pack_string(parts, string_id, "order ids")
+    if string_table is not None:
+        _pack_string(parts, string_table, "table numbers")
+    for name, quantity, price_cents in items:
+        _pack_string(parts, name, "item names")
+        parts.append(_ITEM.pack(quantity, price_cents))
+    payload = b"".join(parts)
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_order(payload):
+    flags, order_id, table_number, item_count = _ORDER.unpack_from(payload, 0)
+    customer_name, offset = _read_string(payload, _ORDER.size)
+    if flags & _STRING_ID:
+        order_id, offset = _read_string(payload, offset)
+    if flags & _STRING_TABLE:
+        table_number, offset = _read_string(payload, offset)
+
+    items = []
+    for _ in range(item_count):
+        name, offset = _read_string(payload, offset)
+        quantity, price_cents = _ITEM.unpack_from(payload, offset)
+        offset += _ITEM.size
+        items.append((name, quantity, price_cents / CENTS))
+
+    if flags & _DINE_IN:
+        order = DineInOrderFactory(None if table_number == _NO_TABLE else table_number).create_order(order_id, customer_name)
+    else:
+        order = TakeawayOrderFactory().create_order(order_id, customer_name)
+    order.items = items
+    return order
+
+
+# Append-only write-ahead journal of added orders. Every record is written to
+# the file as soon as it is appended, so a crash of the process loses nothing;
+# the policy only decides how often the data is forced to the disk.
+class OrderJournal:
+    def __init__(self, path, sync=SYNC_GROUP, group_size=64):
+        if sync not in (SYNC_ALWAYS, SYNC_GROUP, SYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {sync}")
+        self.path = path
+        self.sync = sync
+        self.group_size = group_size
+        self._unsynced = 0  # records written since the last fsync
+        self._file = open(path, "ab")
+
+    def append(self, order, items=None):
+        self._file.write(encode_order(order, items))
+        self._file.flush()
+        self._unsynced += 1
+        if self.sync == SYNC_ALWAYS or (self.sync == SYNC_GROUP and self._unsynced >= self.group_size):
+            self.commit()
+
+    # fsync the records written since the last fsync (unless the policy is SYNC_NEVER)
+    def commit(self):
+        if self._unsynced and self.sync != SYNC_NEVER:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    # Orders stored in the journal, read through a memory map. A torn or corrupt
+    # record at the end (a crash in the middle of a write) is cut off the file.
+    def replay(self):
+        self.commit()
+        size = os.path.getsize(self.path)
+        if size == 0:
+            return
+        with open(self.path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            offset = 0
+            try:
+                while offset + _HEADER.size <= size:
+                    length, checksum = _HEADER.unpack_from(view, offset)
+                    start = offset + _HEADER.size
+                    payload = view[start:start + length]
+                    if len(payload) < length or zlib.crc32(payload) != checksum:
+                        break
+                    yield decode_order(payload)
+                    offset = start + length
+            finally:
+                payload = None
+                view.release()
+        if offset < size:
+            self._file.truncate(offset)
+
+    # Drop every record; OrderManager.clear does this so cleared orders stay gone
+    def truncate(self):
+        self._file.truncate(0)
+        if self.sync != SYNC_NEVER:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        self.commit()
+        self._file.close()
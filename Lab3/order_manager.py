@@ -1,19 +1,186 @@
-# Singleton class for managing orders (with Observer Pattern)
+import threading
+from collections import defaultdict
+
+from instrumentation import Instrumentation
+from line_item_store import LineItemStore
+from menu_catalog import MenuCatalog
+from observer_dispatcher import AsyncObserverDispatcher, BLOCK
+
+_ID_LOCK_STRIPES = 64
+
+
+# Singleton class for managing orders (with Observer Pattern).
+#
+# Safe to use from several threads:
+# - order ids are reserved under one of _ID_LOCK_STRIPES locks chosen by the id's
+#   hash, so the duplicate check of unrelated ids never contends
+# - the order store (columnar items, order list, indexes, journal) is appended
+#   to under one lock, held only for the append itself. The line item store
+#   shares that lock, so edits of stored orders (Order.add_item, update_item,
+#   remove_item) never interleave with an append
+# - the observer list is copy-on-write: it is replaced, never changed in place,
+#   so notification iterates a snapshot without locking. Synchronous
+#   notifications are delivered one order at a time, so observers need not be
+#   thread-safe themselves
 class OrderManager:
     _instance = None  # Class-level private attribute
+    _initialized = False
+    _instance_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(OrderManager, cls).__new__(cls)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super(OrderManager, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
-        self.orders = []
-        self.observers = []  # List to hold registered observers
+        # OrderManager() returns the same instance every time; only set it up once
+        if self._initialized:
+            return
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._setup()
+            self._initialized = True
+
+    def _setup(self):
+        self._id_locks = [threading.Lock() for _ in range(_ID_LOCK_STRIPES)]
+        self._reserved_ids = set()  # ids of orders being added right now
+        self._store_lock = threading.RLock()  # re-entered by the line item store
+        self._observer_lock = threading.Lock()
+        self._notify_lock = threading.Lock()
+
+        self.observers = []  # List to hold registered observers (replaced on change, never mutated)
+        self.dispatcher = None  # AsyncObserverDispatcher when notifications are asynchronous
+        self.journal = None     # OrderJournal when added orders are made durable
+        self.instrumentation = Instrumentation()  # disabled until enabled by the caller
+        self.catalog = MenuCatalog()  # item ids shared by every stored line item
+        self.clear()
+
+    # Forget every order (observers, dispatcher and menu catalog are kept). An
+    # attached journal is emptied as well, so the cleared orders do not come back
+    # on the next replay; detach the journal first to keep its records. Observers
+    # with a reset() method (aggregates, rankings) are reset to match.
+    def clear(self):
+        self.flush()  # pending asynchronous notifications land before the reset
+        with self._store_lock:
+            if self.journal is not None:
+                self.journal.truncate()
+            self.orders = []
+            self.item_store = LineItemStore(self.catalog, self._store_lock)  # Columnar line items of every order
+
+            # Hash indexes maintained on add_order
+            self._orders_by_id = {}
+            self._orders_by_customer = defaultdict(list)
+            self._orders_by_table = defaultdict(list)
+            self._orders_by_type = defaultdict(list)
+        with self._notify_lock:
+            for observer in self.observers:
+                reset = getattr(observer, "reset", None)
+                if reset is not None:
+                    reset()
 
     def add_order(self, order):
+        stats = self.instrumentation
+        start = stats.now() if stats.enabled else 0
+        order_id = order.order_id
+        # Reserve the id, so that a concurrent add_order of the same id is rejected
+        with self._id_locks[hash(order_id) % _ID_LOCK_STRIPES]:
+            if order_id in self._orders_by_id or order_id in self._reserved_ids:
+                raise ValueError(f"Order ID {order_id} already exists")
+            self._reserved_ids.add(order_id)
+        dispatcher = self.dispatcher
+        reserved = False
+        try:
+            if dispatcher is not None:
+                reserved = dispatcher.reserve()  # with the error policy a full queue rejects the order here
+            # Items are checked and converted first: a bad item rejects the order
+            # before anything is written to the journal or the store
+            rows = self.item_store.convert_items(order.items)
+            with self._store_lock:
+                if self.journal is not None:
+                    names = self.catalog.item_names
+                    # write-ahead: journal first, then memory
+                    self.journal.append(order, [(names[item_id], quantity, cents) for item_id, quantity, cents in rows])
+                self._store_order(order, rows)
+        except BaseException:
+            if reserved:
+                dispatcher.release()
+            raise
+        finally:
+            self._reserved_ids.discard(order_id)
+        self.notify_observers(order, reserved)  # Notify all observers about the new order
+        if start:
+            stats.record("add_order", start)
+            stats.increment("orders_added")
+
+    def _store_order(self, order, rows=None):
+        # Move the order's items into the columnar store and keep a view on the order
+        if rows is None:
+            rows = self.item_store.convert_items(order.items)
+        order.items = self.item_store.add_rows(len(self.orders), rows)
         self.orders.append(order)
-        self.notify_observers(order)  # Notify all observers about the new order
+        self._index_order(order)
+
+    # Restore the orders recorded in the journal, then journal every new order.
+    # Replayed orders are not journaled again and are not announced as new
+    # orders; observers with a restore(orders) method (aggregates, rankings)
+    # are handed the restored orders so their state covers them too.
+    def attach_journal(self, journal):
+        restored = []
+        with self._store_lock:
+            for order in journal.replay():
+                if order.order_id not in self._orders_by_id:
+                    self._store_order(order)
+                    restored.append(order)
+            self.journal = journal
+        self.flush()  # let pending asynchronous notifications reach the observers first
+        with self._notify_lock:
+            for observer in self.observers:
+                restore = getattr(observer, "restore", None)
+                if restore is not None:
+                    restore(restored)
+
+    def detach_journal(self):
+        with self._store_lock:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+
+    def add_orders(self, orders):
+        for order in orders:
+            self.add_order(order)
+
+    def _index_order(self, order):
+        self._orders_by_id[order.order_id] = order
+        self._orders_by_customer[order.customer_name].append(order)
+        self._orders_by_type[order.kind].append(order)
+        table_number = getattr(order, "table_number", None)
+        if table_number is not None:
+            self._orders_by_table[table_number].append(order)
+
+    # Index lookups, independent of the number of orders held
+    def get(self, order_id, default=None):
+        return self._orders_by_id.get(order_id, default)
+
+    def has_order(self, order_id):
+        return order_id in self._orders_by_id
+
+    def by_customer(self, customer_name):
+        return list(self._orders_by_customer.get(customer_name, ()))
+
+    def by_table(self, table_number):
+        return list(self._orders_by_table.get(table_number, ()))
+
+    def by_type(self, kind):
+        return list(self._orders_by_type.get(kind, ()))
+
+    def total_revenue(self):
+        return self.item_store.total_revenue()
+
+    def revenue_by_item(self):
+        return self.item_store.revenue_by_item()
 
     def list_orders(self):
         for order in self.orders:
@@ -21,13 +188,57 @@ class OrderManager:
 
     # Observer Pattern: Register an observer
     def register_observer(self, observer):
-        self.observers.append(observer)
+        with self._observer_lock:
+            self.observers = self.observers + [observer]
+
+    # The registered observer of the given type; one is created and registered when there is none
+    def ensure_observer(self, observer_type):
+        with self._observer_lock:
+            for observer in self.observers:
+                if type(observer) is observer_type:
+                    return observer
+            observer = observer_type()
+            self.observers = self.observers + [observer]
+            return observer
 
     # Observer Pattern: Remove an observer
     def remove_observer(self, observer):
-        self.observers.remove(observer)
+        with self._observer_lock:
+            observers = list(self.observers)
+            observers.remove(observer)
+            self.observers = observers
+
+    # Deliver notifications on a background thread instead of inside add_order
+    def enable_async_dispatch(self, max_queue_size=1024, policy=BLOCK):
+        if self.dispatcher is None:
+            self.dispatcher = AsyncObserverDispatcher(lambda: self.observers, max_queue_size, policy,
+                                                      self.instrumentation)
+        return self.dispatcher
+
+    def disable_async_dispatch(self):
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+            self.dispatcher = None
+
+    # Wait until all pending asynchronous notifications have been delivered
+    def flush(self):
+        if self.dispatcher is not None:
+            self.dispatcher.flush()
 
-    # Notify all observers
-    def notify_observers(self, order):
-        for observer in self.observers:
-            observer.update(order)
+    # Notify all observers; reserved: a dispatcher queue slot was claimed for the order
+    def notify_observers(self, order, reserved=False):
+        stats = self.instrumentation
+        start = stats.now() if stats.enabled else 0
+        if self.dispatcher is not None:
+            self.dispatcher.submit(order, reserved)  # the dispatcher counts the callbacks it delivers
+            if start:
+                stats.record("notify_observers", start)
+                stats.increment("notifications_queued")
+            return
+        observers = self.observers  # snapshot; a concurrent (un)register replaces the list
+        with self._notify_lock:
+            for observer in observers:
+                observer.update(order)
+        if start:
+            stats.record("notify_observers", start)
+            stats.increment("observer_callbacks", len(observers))
@@ -0,0 +1,211 @@
+import heapq
+import time
+from collections import deque
+from itertools import count
+
+from money import CENTS
+from observer import Observer
+
+# Keys with the largest running totals. The board holds the `capacity` leading
+# keys; while totals only grow, a key outside it can only enter by passing the
+# smallest total on the board, which it then replaces. A total that shrinks on
+# the board marks it stale, and the next read rebuilds it from all totals.
+class Leaderboard:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.totals = {}  # key -> running total, every key seen
+        self.board = {}   # the leading keys and their totals
+        # (total, sequence, key) of board entries; stale entries are skipped. The
+        # sequence breaks ties, so keys of different types are never compared
+        self._heap = []
+        self._next_sequence = count().__next__
+        self._ranked = None  # board entries sorted largest first, None after a change
+        self._stale = False
+
+    def add(self, key, amount):
+        total = self.totals.get(key, 0) + amount
+        self.totals[key] = total
+        board = self.board
+        if self._stale or (amount < 0 and key in board):
+            self._stale = True
+            return
+        if key in board or len(board) < self.capacity:
+            board[key] = total
+        else:
+            smallest, smallest_key = self._smallest()
+            if total <= smallest:
+                return
+            heapq.heappop(self._heap)
+            del board[smallest_key]
+            board[key] = total
+        self._ranked = None
+        heapq.heappush(self._heap, (total, self._next_sequence(), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heapify()
+
+    def _smallest(self):
+        heap = self._heap
+        board = self.board
+        while True:
+            total, _, key = heap[0]
+            if board.get(key) == total:
+                return total, key
+            heapq.heappop(heap)
+
+    def _heapify(self):
+        self._heap = [(total, self._next_sequence(), key) for key, total in self.board.items()]
+        heapq.heapify(self._heap)
+
+    def _rebuild(self):
+        self.board = dict(heapq.nlargest(self.capacity, self.totals.items(), key=lambda entry: entry[1]))
+        self._heapify()
+        self._ranked = None
+        self._stale = False
+
+    # The k leading (key, total) pairs, largest first; k beyond the capacity
+    # falls back to a selection over all totals
+    def top(self, k):
+        if k > self.capacity:
+            return heapq.nlargest(k, self.totals.items(), key=lambda entry: entry[1])
+        if self._stale:
+            self._rebuild()
+        if self._ranked is None:
+            self._ranked = sorted(self.board.items(), key=lambda entry: entry[1], reverse=True)
+        return self._ranked[:k]
+
+
+# Added orders seen within one bucket_seconds stretch of time
+class _Bucket:
+    __slots__ = ("start", "orders", "customer_orders", "table_revenue_cents")
+
+    def __init__(self, start):
+        self.start = start
+        self.orders = []  # bounded min-heap of (subtotal cents, -sequence, order id)
+        self.customer_orders = {}
+        self.table_revenue_cents = {}
+
+
+# Top-K rankings kept up to date as an observer of OrderManager: highest-value
+# orders, most frequent customers and tables with the highest revenue. All-time
+# rankings are bounded structures updated on every added order, so reading one
+# costs O(capacity), never a sort of all orders. Rankings over a recent time
+# window (at most max_window seconds, in bucket_seconds steps) merge the
+# per-bucket rankings. Orders are ranked by their subtotal when they were added.
+class OrderRankingsObserver(Observer):
+    def __init__(self, capacity=100, bucket_seconds=60, max_window=3600, clock=time.time):
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.max_window = max_window
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self._sequence = 0
+        self._orders = []  # bounded min-heap of (subtotal cents, -sequence, order id)
+        self._top_orders = None  # sorted copy of _orders, rebuilt after a change
+        self._customers = Leaderboard(self.capacity)
+        self._tables = Leaderboard(self.capacity)
+        self._buckets = deque()
+
+    def update(self, order):
+        subtotal, entry, customer, table_number = self._rank(order)
+        bucket = self._current_bucket()
+        self._push_order(bucket.orders, entry)
+        bucket.customer_orders[customer] = bucket.customer_orders.get(customer, 0) + 1
+        if table_number is not None:
+            bucket.table_revenue_cents[table_number] = bucket.table_revenue_cents.get(table_number, 0) + subtotal
+
+    # Add the order to the all-time rankings
+    def _rank(self, order):
+        subtotal = order.subtotal_cents
+        self._sequence += 1
+        entry = (subtotal, -self._sequence, order.order_id)
+        if self._push_order(self._orders, entry):
+            self._top_orders = None
+
+        customer = order.customer_name
+        self._customers.add(customer, 1)
+        table_number = getattr(order, "table_number", None)
+        if table_number is not None:
+            self._tables.add(table_number, subtotal)
+        return subtotal, entry, customer, table_number
+
+    # Orders restored from a journal by OrderManager.attach_journal. They only
+    # count toward the all-time rankings: when they were added is not recorded.
+    def restore(self, orders):
+        for order in orders:
+            self._rank(order)
+
+    # Keep the heap at capacity entries; True when the entry was kept
+    def _push_order(self, heap, entry):
+        if len(heap) < self.capacity:
+            heapq.heappush(heap, entry)
+            return True
+        if entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+            return True
+        return False
+
+    def _current_bucket(self):
+        now = self.clock()
+        start = now - now % self.bucket_seconds
+        buckets = self._buckets
+        if not buckets or buckets[-1].start != start:
+            buckets.append(_Bucket(start))
+            self._expire(now)
+        return buckets[-1]
+
+    def _expire(self, now):
+        buckets = self._buckets
+        while buckets and buckets[0].start + self.bucket_seconds <= now - self.max_window:
+            buckets.popleft()
+
+    # Buckets overlapping the last `window` seconds
+    def _window(self, window):
+        if window > self.max_window:
+            raise ValueError(f"Window of {window}s is longer than the {self.max_window}s kept")
+        now = self.clock()
+        self._expire(now)
+        return [bucket for bucket in self._buckets if bucket.start + self.bucket_seconds > now - window]
+
+    def _check_k(self, k):
+        if k > self.capacity:
+            raise ValueError(f"Rankings keep the top {self.capacity}, not {k}")
+
+    # (order id, subtotal) of the k highest-value orders, all time or within the last window seconds
+    def top_orders(self, k=10, window=None):
+        self._check_k(k)
+        if window is None:
+            if self._top_orders is None:
+                self._top_orders = sorted(self._orders, reverse=True)
+            entries = self._top_orders[:k]
+        else:
+            entries = heapq.nlargest(k, (entry for bucket in self._window(window) for entry in bucket.orders))
+        return [(order_id, cents / CENTS) for cents, _, order_id in entries]
+
+    # (customer name, order count) of the k customers with the most orders
+    def top_customers(self, k=10, window=None):
+        self._check_k(k)
+        if window is None:
+            return self._customers.top(k)
+        return self._merged_top((bucket.customer_orders for bucket in self._window(window)), k)
+
+    # (table number, revenue) of the k tables with the highest revenue
+    def top_tables(self, k=10, window=None):
+        self._check_k(k)
+        if window is None:
+            return [(table, cents / CENTS) for table, cents in self._tables.top(k)]
+        merged = self._merged_top((bucket.table_revenue_cents for bucket in self._window(window)), k)
+        return [(table, cents / CENTS) for table, cents in merged]
+
+    @staticmethod
+    def _merged_top(counters, k):
+        merged = {}
+        for counter in counters:
+            for key, value in counter.items():
+                merged[key] = merged.get(key, 0) + value
+        return heapq.nlargest(k, merged.items(), key=lambda entry: entry[1])
+
+    # Orders worth at least threshold (in major units), highest first and at most capacity of them, for alerting
+    def orders_over(self, threshold, window=None):
+        return [(order_id, total) for order_id, total in self.top_orders(self.capacity, window) if total >= threshold]
@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from cost_decorator import cached_pricing
+from observer import LoggingObserver, ReportGeneratorObserver
+from order_adapter import OrderAdapter
+from system_facade import SystemFacade
+
+# Order intake server: newline-delimited JSON over persistent TCP connections.
+#
+# Every request line is an external order (the OrderAdapter format), optionally
+# with "report" ("text" or "html") and the pricing fields "tax_rate",
+# "service_charge" and "discount_percentage". The response line is
+# {"id": ..., "total": ...} plus "report" when one was asked for, or
+# {"id": ..., "error": ...}. {"command": "stats"} returns the server counters.
+#
+# Clients may pipeline: many requests can be sent without waiting, and the
+# responses come back in request order. Requests from all connections are
+# queued and handled in micro-batches, one SystemFacade.create_order per order,
+# so the event loop switches once per batch instead of once per request.
+#
+# Item names come from the clients, and every new name takes a place in the
+# shared menu catalog for good. The catalog is bounded to max_items names, and
+# with menu_only an order with an item that is not on the menu is refused.
+
+PRICING_FIELDS = ("tax_rate", "service_charge", "discount_percentage")
+REPORT_FORMATS = ("text", "html")
+
+
+class OrderServer:
+    def __init__(self, facade, host="127.0.0.1", port=8765, max_batch=256, batch_delay=0.0,
+                 max_pipeline=128, report_interval=None, menu_only=False, max_items=10000):
+        self.facade = facade
+        self.menu_only = menu_only
+        if max_items is not None:
+            facade.catalog.max_items = max_items
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay      # seconds to wait for more requests when a batch is small
+        self.max_pipeline = max_pipeline    # requests in flight per connection before reading pauses
+        self.report_interval = report_interval
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self._started = None
+        self._intake = None
+        self._server = None
+        self._tasks = []
+
+    async def start(self):
+        self._intake = asyncio.Queue()
+        self._started = time.perf_counter()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  backlog=4096, limit=1024 * 1024)
+        self.port = self._server.sockets[0].getsockname()[1]  # the actual port when 0 was asked for
+        self._tasks.append(asyncio.create_task(self._batch_loop()))
+        if self.report_interval:
+            self._tasks.append(asyncio.create_task(self._report_loop()))
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "average_batch": self.requests / self.batches if self.batches else 0,
+            "requests_per_second": self.requests / elapsed if elapsed else 0,
+        }
+
+    # One reader loop per connection; a writer task sends the responses in request order
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        pending = asyncio.Queue(self.max_pipeline)
+        responder = asyncio.create_task(self._write_responses(writer, pending))
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # reset, or a line over the limit
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                future = loop.create_future()
+                await pending.put(future)
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    self.errors += 1
+                    future.set_result(_encode({"error": f"Invalid JSON: {error}"}))
+                    continue
+                if isinstance(request, dict) and request.get("command") == "stats":
+                    future.set_result(_encode(self.stats()))
+                    continue
+                self._intake.put_nowait((request, future))
+        finally:
+            await pending.put(None)
+            await responder
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _write_responses(self, writer, pending):
+        broken = False
+        while True:
+            future = await pending.get()
+            if future is None:
+                return
+            response = await future
+            if broken:
+                continue
+            writer.write(response)
+            if pending.empty():
+                try:
+                    await writer.drain()  # one flush per burst of responses
+                except ConnectionError:
+                    broken = True
+
+    async def _batch_loop(self):
+        intake = self._intake
+        while True:
+            batch = [await intake.get()]
+            while len(batch) < self.max_batch and not intake.empty():
+                batch.append(intake.get_nowait())
+            if len(batch) < self.max_batch and self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+                while len(batch) < self.max_batch and not intake.empty():
+                    batch.append(intake.get_nowait())
+            try:
+                self._process(batch)
+            except Exception as error:  # never let one batch stop the intake
+                self._fail(batch, error)
+
+    def _process(self, batch):
+        facade = self.facade
+        catalog = facade.catalog
+        for request, future in batch:
+            try:
+                arguments = OrderAdapter(request, catalog).to_order_arguments()
+                if self.menu_only:
+                    for item in arguments[3]:
+                        if not catalog.on_menu(item[0]):
+                            raise ValueError(f"Not on the menu: {item[0]}")
+                # Everything the response needs is checked before the order is
+                # stored, so a refused request can be corrected and sent again
+                pricing = [request.get(field, 0) for field in PRICING_FIELDS]
+                cached_pricing(*pricing)
+                report = request.get("report")
+                if report and report not in REPORT_FORMATS:
+                    raise ValueError(f"Unknown report format: {report}")
+                order = facade.create_order(*arguments)
+                response = {"id": order.order_id, "total": facade.calculate_cost(order, *pricing)}
+                if report:
+                    response["report"] = facade.generate_report(order, report, *pricing)
+            except Exception as error:  # a bad order fails alone, e.g. OverflowError or a malformed price
+                self.errors += 1
+                response = _error_response(request, error)
+            if not future.done():
+                future.set_result(_encode(response))
+        self.requests += len(batch)
+        self.batches += 1
+
+    # Answer every request of the batch still waiting with the error
+    def _fail(self, batch, error):
+        for request, future in batch:
+            if not future.done():
+                self.errors += 1
+                future.set_result(_encode(_error_response(request, error)))
+
+    async def _report_loop(self):
+        last_requests, last_time = self.requests, time.perf_counter()
+        while True:
+            await asyncio.sleep(self.report_interval)
+            now = time.perf_counter()
+            rate = (self.requests - last_requests) / (now - last_time)
+            print(f"[OrderServer] {rate:,.0f} requests/s, {self.connections} connections, "
+                  f"{self.requests} requests, {self.errors} errors", file=sys.stderr)
+            last_requests, last_time = self.requests, now
+
+
+def _error_response(request, error):
+    order_id = request.get("id") if isinstance(request, dict) else None
+    return {"id": order_id, "error": f"{type(error).__name__}: {error}"}
+
+
+def _encode(response):
+    return json.dumps(response).encode("utf-8") + b"\n"
+
+
+# Load generator: `connections` terminals each send `orders` orders, pipelined
+# `pipeline` at a time, over one persistent connection. Returns requests per second.
+async def run_load(host, port, connections=1000, orders=20, pipeline=8, report=None):
+    async def terminal(index):
+        reader, writer = await asyncio.open_connection(host, port)
+        sent = received = 0
+        while received < orders:
+            while sent < orders and sent - received < pipeline:
+                order_id = index * orders + sent
+                request = {"id": order_id, "customer_name": f"Terminal {index}", "order_type": "takeaway",
+                           "items": [{"name": "Burger", "quantity": 1 + order_id % 3, "price": 8.5},
+                                     {"name": "Soda", "quantity": 1, "price": 1.99}]}
+                if report:
+                    request["report"] = report
+                writer.write(_encode(request))
+                sent += 1
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            if "error" in response:
+                raise RuntimeError(response["error"])
+            received += 1
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(terminal(index) for index in range(connections)))
+    return connections * orders / (time.perf_counter() - start)
+
+
+def make_facade(log_orders=False):
+    facade = SystemFacade()
+    if not log_orders:
+        for observer in list(facade.order_manager.observers):
+            if isinstance(observer, (LoggingObserver, ReportGeneratorObserver)):
+                facade.order_manager.remove_observer(observer)
+    return facade
+
+
+async def _self_test(args):
+    server = await OrderServer(make_facade(), args.host, 0, args.max_batch, args.batch_delay).start()
+    try:
+        rate = await run_load(server.host, server.port, args.self_test, args.orders, args.pipeline, args.report)
+    finally:
+        await server.close()
+    stats = server.stats()
+    print(f"{args.self_test} connections x {args.orders} orders: {rate:,.0f} requests/s, "
+          f"average batch {stats['average_batch']:.1f}, {stats['errors']} errors")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NDJSON order intake server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256, help="requests handled per micro-batch")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="seconds to wait for a batch to fill")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="seconds between requests/s reports")
+    parser.add_argument("--log-orders", action="store_true", help="keep the logging observers")
+    parser.add_argument("--menu", metavar="FILE", help="CSV menu (name,price) to load")
+    parser.add_argument("--menu-only", action="store_true", help="refuse orders with items not on the menu")
+    parser.add_argument("--max-items", type=int, default=10000, help="most distinct item names the catalog takes")
+    parser.add_argument("--self-test", type=int, metavar="CONNECTIONS",
+                        help="serve on a free port and load it with CONNECTIONS terminals, then exit")
+    parser.add_argument("--orders", type=int, default=20, help="orders per terminal in the self-test")
+    parser.add_argument("--pipeline", type=int, default=8, help="requests in flight per terminal in the self-test")
+    parser.add_argument("--report", choices=["text", "html"], help="ask for a report with every self-test order")
+    args = parser.parse_args(argv)
+
+    if args.self_test:
+        asyncio.run(_self_test(args))
+        return 0
+    facade = make_facade(args.log_orders)
+    if args.menu:
+        with open(args.menu, newline="", encoding="utf-8") as menu:
+            facade.load_menu(menu)
+    server = OrderServer(facade, args.host, args.port, args.max_batch, args.batch_delay,
+                         report_interval=args.report_interval, menu_only=args.menu_only, max_items=args.max_items)
+    print(f"Serving orders on {args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+from bisect import bisect_right
+from datetime import datetime, time
+
+from cost_calculator import CostCalculator
+from money import percent_of, rate_units, to_cents
+from order import iter_item_cents
+
+# Promotion rules. Prices are per unit; every discount is rounded to whole cents.
+#
+# How rules combine on one order:
+# 1. combo bundles take units first, in the order the rules were given, as many
+#    sets as the units allow, but only when that is cheaper than pricing those
+#    units with the rules below
+# 2. buy-X-get-Y applies to the units left, the most generous rule per item
+# 3. item discounts and active happy hours apply to the units still left; per
+#    item only the largest of them applies, they do not stack
+# An item on several lines at different unit prices keeps each unit's own
+# price: bundles take the dearest units, buy-X-get-Y frees the cheapest, and
+# percentages and amounts off apply to the price of every unit left.
+
+
+# Percentage or fixed amount off every unit of an item
+class ItemDiscount:
+    def __init__(self, item, percentage=0, amount_off=0):
+        self.item = item
+        self.percentage = percentage
+        self.amount_off = amount_off
+
+
+# For every `buy` units of an item, `get` more units are free
+class BuyXGetY:
+    def __init__(self, item, buy, get=1):
+        if buy < 1 or get < 1:
+            raise ValueError("buy and get must be at least 1")
+        self.item = item
+        self.buy = buy
+        self.get = get
+
+
+# A set of items (name -> units) sold together for a fixed price
+class ComboBundle:
+    def __init__(self, items, price):
+        if not items:
+            raise ValueError("A combo bundle needs at least one item")
+        self.items = dict(items)
+        self.price = price
+
+
+# Percentage off the given items (every item when None) between start and end,
+# as datetime.time or "HH:MM"; a window with end before start spans midnight
+class HappyHour:
+    def __init__(self, start, end, percentage, items=None):
+        self.start = _parse_time(start)
+        self.end = _parse_time(end)
+        self.percentage = percentage
+        self.items = None if items is None else frozenset(items)
+
+    def is_active(self, at):
+        if self.start <= self.end:
+            return self.start <= at < self.end
+        return at >= self.start or at < self.end
+
+
+def _parse_time(value):
+    if isinstance(value, str):
+        hours, minutes = value.split(":")
+        return time(int(hours), int(minutes))
+    return value
+
+
+# Take count units off (unit price in cents, units) groups sorted by price, the
+# cheapest first or the dearest first; returns their value and the groups left
+def _take_units(groups, count, dearest=False):
+    value = 0
+    left = []
+    for price_cents, units in (reversed(groups) if dearest else groups):
+        taken = min(units, count)
+        value += taken * price_cents
+        count -= taken
+        if units > taken:
+            left.append((price_cents, units - taken))
+    if dearest:
+        left.reverse()
+    return value, left
+
+
+# Cost calculator applying promotion rules to the order subtotal. The rules are
+# compiled once into lookup tables keyed by item name, so pricing an order is one
+# pass over its lines plus one lookup per distinct item, whatever the number of
+# rules. Every bundle is indexed under one of its items and only checked when
+# the order holds that item.
+class PromotionCalculator(CostCalculator):
+    # at: time of day used for happy hours, None for the current time at pricing
+    def __init__(self, rules, at=None):
+        self.rules = list(rules)
+        self.at = _parse_time(at)
+        self._compile()
+
+    def _compile(self):
+        self._percent = {}      # item -> best percentage, in rate units
+        self._amount_off = {}   # item -> best amount off per unit, in cents
+        self._buy_get = {}      # item -> (buy, get) with the largest free share
+        self._bundles = []      # (((item, units), ...), bundle price in cents)
+        self._bundles_by_item = {}  # item -> (index, the bundle's other items) of the bundles indexed under it
+        self._happy_hours = []
+        self._boundaries = []   # sorted times at which some happy hour starts or ends
+        self._tables = {}       # index into _boundaries -> (percent table, rate for every item)
+
+        for rule in self.rules:
+            if isinstance(rule, ItemDiscount):
+                if rule.percentage:
+                    units = rate_units(rule.percentage)
+                    self._percent[rule.item] = max(units, self._percent.get(rule.item, 0))
+                if rule.amount_off:
+                    cents = to_cents(rule.amount_off)
+                    self._amount_off[rule.item] = max(cents, self._amount_off.get(rule.item, 0))
+            elif isinstance(rule, BuyXGetY):
+                current = self._buy_get.get(rule.item)
+                if current is None or rule.get * (current[0] + current[1]) > current[1] * (rule.buy + rule.get):
+                    self._buy_get[rule.item] = (rule.buy, rule.get)
+            elif isinstance(rule, ComboBundle):
+                index = len(self._bundles)
+                self._bundles.append((tuple(rule.items.items()), to_cents(rule.price)))
+                # An order can only fill a bundle if it holds every item of it, so one
+                # item suffices as the key: the one with the fewest bundles so far
+                key = min(rule.items, key=lambda item: len(self._bundles_by_item.get(item, ())))
+                self._bundles_by_item.setdefault(key, []).append((index, frozenset(rule.items) - {key}))
+            elif isinstance(rule, HappyHour):
+                self._happy_hours.append((rule, rate_units(rule.percentage)))
+            else:
+                raise ValueError(f"Unknown promotion rule: {type(rule).__name__}")
+        self._boundaries = sorted({rule.start for rule, _ in self._happy_hours} |
+                                  {rule.end for rule, _ in self._happy_hours})
+
+    # Item discount tables with the happy hours active at the given time merged in.
+    # The set of active happy hours only changes at a boundary, so the tables are
+    # built once per stretch of time between two boundaries.
+    def _tables_at(self, at):
+        segment = bisect_right(self._boundaries, at) - 1
+        tables = self._tables.get(segment)
+        if tables is None:
+            start = self._boundaries[segment] if segment >= 0 else time.min
+            percent = dict(self._percent)
+            every_item = 0
+            for rule, units in self._happy_hours:
+                if not rule.is_active(start):
+                    continue
+                if rule.items is None:
+                    every_item = max(every_item, units)
+                else:
+                    for item in rule.items:
+                        percent[item] = max(units, percent.get(item, 0))
+            tables = self._tables[segment] = (percent, every_item)
+        return tables
+
+    def _time(self):
+        return self.at if self.at is not None else datetime.now().time()
+
+    def calculate_total_cents(self, order):
+        return self._price(order, *self._tables_at(self._time()))
+
+    # Batch re-pricing: the clock is read and the tables looked up once for all orders
+    def calculate_totals_cents(self, orders):
+        percent, every_item = self._tables_at(self._time())
+        price = self._price
+        return [price(order, percent, every_item) for order in orders]
+
+    def _price(self, order, percent, every_item):
+        # One pass over the lines: units and (unit price, units) groups per item
+        quantities = {}
+        groups = {}
+        subtotal = 0
+        for name, quantity, price_cents in iter_item_cents(order):
+            subtotal += quantity * price_cents
+            if name in quantities:
+                quantities[name] += quantity
+                groups[name].append((price_cents, quantity))
+            else:
+                quantities[name] = quantity
+                groups[name] = [(price_cents, quantity)]
+        for name, item_groups in groups.items():
+            if len(item_groups) > 1:
+                item_groups.sort()
+
+        discount = 0
+        bundles_by_item = self._bundles_by_item
+        if bundles_by_item:
+            names = quantities.keys()
+            candidates = []
+            for name in quantities:
+                entries = bundles_by_item.get(name)
+                if entries:
+                    for index, others in entries:
+                        if names >= others:  # the order holds every item of the bundle
+                            candidates.append(index)
+            candidates.sort()
+            for index in candidates:
+                discount += self._apply_bundle(index, quantities, groups, percent, every_item)
+
+        item_discount = self._item_discount
+        for name, item_groups in groups.items():
+            if item_groups:
+                discount += item_discount(name, quantities[name], item_groups, percent, every_item)
+
+        return max(subtotal - discount, 0)
+
+    # Take as many sets of the bundle as the units allow, when that costs less
+    # than the per-item rules on the same units; returns the bundle's discount
+    def _apply_bundle(self, index, quantities, groups, percent, every_item):
+        components, bundle_price = self._bundles[index]
+        count = None
+        for item, units in components:
+            sets = quantities.get(item, 0) // units
+            if not sets:
+                return 0
+            if count is None or sets < count:
+                count = sets
+        item_discount = self._item_discount
+        bundle_discount = -count * bundle_price
+        forgone = 0  # per-item discounts the units would get instead
+        left = []
+        for item, units in components:
+            quantity, item_groups = quantities[item], groups[item]
+            value, item_left = _take_units(item_groups, count * units, dearest=True)
+            bundle_discount += value
+            left.append(item_left)
+            forgone += (item_discount(item, quantity, item_groups, percent, every_item) -
+                        item_discount(item, quantity - count * units, item_left, percent, every_item))
+        if bundle_discount <= forgone:
+            return 0
+        for (item, units), item_left in zip(components, left):
+            quantities[item] -= count * units
+            groups[item] = item_left
+        return bundle_discount
+
+    # Discount on units of an item left to the per-item rules, given as
+    # (unit price, units) groups sorted by price: buy-X-get-Y first (the
+    # cheapest units go free), then the larger of the percentage and the amount off
+    def _item_discount(self, name, quantity, groups, percent, every_item):
+        if not quantity:
+            return 0
+        discount = 0
+        rule = self._buy_get.get(name)
+        if rule is not None:
+            buy, get = rule
+            free = quantity // (buy + get) * get
+            if free:
+                discount, groups = _take_units(groups, free)
+        units = max(percent.get(name, 0), every_item)
+        by_percent = percent_of(sum(price_cents * count for price_cents, count in groups), units) if units else 0
+        amount_off = self._amount_off.get(name, 0)
+        by_amount = sum(count * min(amount_off, price_cents) for price_cents, count in groups) if amount_off else 0
+        return discount + max(by_percent, by_amount)
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+
+# Bounded LRU cache of rendered reports. Keys are
+# (order id, order version, format, pricing configuration); the cache keeps one
+# version per order and drops the older one as soon as a newer version is seen.
+# Order versions are unique across orders (see order.py), so a different order
+# object with a reused id never hits the reports of the old one.
+class ReportCache:
+    def __init__(self, max_entries=1024, max_size=None):
+        self.max_entries = max_entries
+        self.max_size = max_size  # total characters of cached reports, None for no limit
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._reports = OrderedDict()
+        self._versions = {}       # order id -> cached version
+        self._keys_by_order = {}  # order id -> keys cached for that order
+
+    def __len__(self):
+        return len(self._reports)
+
+    def _check_version(self, order_id, version):
+        cached_version = self._versions.get(order_id)
+        if cached_version is not None and cached_version != version:
+            self.invalidate(order_id)
+
+    def get(self, order_id, version, format, pricing):
+        self._check_version(order_id, version)
+        key = (order_id, version, format, pricing)
+        report = self._reports.get(key)
+        if report is None:
+            self.misses += 1
+            return None
+        self._reports.move_to_end(key)
+        self.hits += 1
+        return report
+
+    def put(self, order_id, version, format, pricing, report):
+        self._check_version(order_id, version)
+        key = (order_id, version, format, pricing)
+        if key in self._reports:
+            self._remove(key)
+        self._reports[key] = report
+        self.size += len(report)
+        self._versions[order_id] = version
+        self._keys_by_order.setdefault(order_id, set()).add(key)
+
+        while self._reports and (len(self._reports) > self.max_entries or
+                                 (self.max_size is not None and self.size > self.max_size)):
+            self._remove(next(iter(self._reports)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        report = self._reports.pop(key)
+        self.size -= len(report)
+        order_id = key[0]
+        keys = self._keys_by_order[order_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_order[order_id]
+            del self._versions[order_id]
+
+    # Drop every cached report of an order
+    def invalidate(self, order_id):
+        for key in list(self._keys_by_order.get(order_id, ())):
+            self._remove(key)
+
+    def clear(self):
+        self._reports.clear()
+        self._versions.clear()
+        self._keys_by_order.clear()
+        self.size = 0
+
+    def stats(self):
+        return {"entries": len(self._reports), "size": self.size, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
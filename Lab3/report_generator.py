@@ -1,25 +1,85 @@
+import io
 from abc import ABC, abstractmethod
+from collections import namedtuple
+from itertools import islice
 
-# Abstract Class for Report Generation
+from cost_decorator import cached_pricing
+from menu_catalog import CatalogItems
+from money import format_cents
+from order import iter_item_cents
+
+# Abstract Class for Report Generation. The total is given in integer cents
+# (SystemFacade.calculate_cost_cents), so money stays exact up to the report.
 class ReportGenerator(ABC):
+    # Yield the report piece by piece, one line at a time
     @abstractmethod
-    def generate_report(self, order, total_cost):
+    def iter_report(self, order, total_cents):
         pass
 
+    def generate_report(self, order, total_cents):
+        return "".join(self.iter_report(order, total_cents))
+
+    # Write the report incrementally to a text or binary file-like sink and
+    # return the number of encoded bytes written (in the text sink's own
+    # encoding, when it has one)
+    def write_report(self, order, total_cents, sink, encoding="utf-8", lines_per_write=64):
+        binary = isinstance(sink, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(sink, "mode", "")
+        if not binary:
+            encoding = getattr(sink, "encoding", None) or encoding
+        written = 0
+        lines = self.iter_report(order, total_cents)
+        while True:
+            chunk = "".join(islice(lines, lines_per_write))
+            if not chunk:
+                return written
+            if binary:
+                data = chunk.encode(encoding)
+                sink.write(data)
+                written += len(data)
+            else:
+                sink.write(chunk)
+                written += encoded_size(chunk, encoding)
+
+
+# Size of the text once encoded; ASCII text is as long in bytes as in characters
+def encoded_size(text, encoding="utf-8"):
+    return len(text) if text.isascii() else len(text.encode(encoding))
+
 # Text Report Generation
 class TextReportGenerator(ReportGenerator):
-    def generate_report(self, order, total_cost):
-        report = f"Order ID: {order.order_id}\nItems:\n"
-        for item in order.items:
-            report += f"{item[0]} - {item[1]} @ {item[2]} each\n"
-        report += f"Total Cost: {total_cost}\n"
-        return report
+    def iter_report(self, order, total_cents):
+        yield f"Order ID: {order.order_id}\nItems:\n"
+        for name, quantity, price_cents in iter_item_cents(order):
+            yield f"{name} - {quantity} @ {format_cents(price_cents)} each\n"
+        yield f"Total Cost: {format_cents(total_cents)}\n"
 
 # HTML Report Generation
 class HTMLReportGenerator(ReportGenerator):
-    def generate_report(self, order, total_cost):
-        report = f"<h1>Order ID: {order.order_id}</h1>\n<ul>\n"
-        for item in order.items:
-            report += f"<li>{item[0]} - {item[1]} @ {item[2]} each</li>\n"
-        report += f"</ul>\n<p>Total Cost: {total_cost}</p>\n"
-        return report
+    def iter_report(self, order, total_cents):
+        yield f"<h1>Order ID: {order.order_id}</h1>\n<ul>\n"
+        for name, quantity, price_cents in iter_item_cents(order):
+            yield f"<li>{name} - {quantity} @ {format_cents(price_cents)} each</li>\n"
+        yield f"</ul>\n<p>Total Cost: {format_cents(total_cents)}</p>\n"
+
+REPORT_GENERATORS = {"text": TextReportGenerator, "html": HTMLReportGenerator}
+
+# Picklable stand-in for an order with just what a report and its pricing need, sent to worker processes
+class ReportOrder(namedtuple("ReportOrder", ["order_id", "items"])):
+    __slots__ = ()
+
+    @property
+    def subtotal_cents(self):
+        return self.items.subtotal_cents()
+
+
+# Price and render a chunk of (order_id, rows) jobs, rows being (index into
+# the chunk's item_names, quantity, unit price in cents), under the pricing
+# configuration (tax_rate, service_charge, discount_percentage); runs inside worker processes
+def render_reports(format, item_names, pricing, jobs):
+    generator = REPORT_GENERATORS[format]()
+    price = cached_pricing(*pricing)
+    reports = []
+    for order_id, rows in jobs:
+        order = ReportOrder(order_id, CatalogItems(item_names, rows))
+        reports.append(generator.generate_report(order, price(order)))
+    return reports
@@ -0,0 +1,110 @@
+from money import CENTS
+from observer import Observer
+from order import iter_item_cents
+from order_rankings import Leaderboard
+
+# Sales aggregates kept up to date as an observer of OrderManager: every added
+# order updates the per item, customer, table and order type totals, so
+# dashboard queries never walk the orders. Amounts are exact, in cents. The
+# item, customer and table revenues are kept on leaderboards of the
+# top_capacity leading keys, so a top-N query reads at most that many entries.
+class SalesAggregatesObserver(Observer):
+    def __init__(self, top_capacity=100):
+        self.top_capacity = top_capacity
+        self.reset()
+
+    def reset(self):
+        self.order_count = 0
+        self.revenue_cents = 0
+        self._item_board = Leaderboard(self.top_capacity)
+        self._customer_board = Leaderboard(self.top_capacity)
+        self._table_board = Leaderboard(self.top_capacity)
+        self.item_revenue_cents = self._item_board.totals
+        self.item_quantity = {}
+        self.customer_spend_cents = self._customer_board.totals
+        self.customer_orders = {}
+        self.table_revenue_cents = self._table_board.totals
+        self.table_orders = {}
+        self.type_revenue_cents = {}
+        self.type_orders = {}
+
+    def update(self, order):
+        subtotal = order.subtotal_cents
+        self.order_count += 1
+        self.revenue_cents += subtotal
+
+        add_item_revenue = self._item_board.add
+        item_quantity = self.item_quantity
+        for name, quantity, price_cents in iter_item_cents(order):
+            add_item_revenue(name, quantity * price_cents)
+            item_quantity[name] = item_quantity.get(name, 0) + quantity
+
+        customer = order.customer_name
+        self._customer_board.add(customer, subtotal)
+        self.customer_orders[customer] = self.customer_orders.get(customer, 0) + 1
+
+        table_number = getattr(order, "table_number", None)
+        if table_number is not None:
+            self._table_board.add(table_number, subtotal)
+            self.table_orders[table_number] = self.table_orders.get(table_number, 0) + 1
+
+        self.type_revenue_cents[order.kind] = self.type_revenue_cents.get(order.kind, 0) + subtotal
+        self.type_orders[order.kind] = self.type_orders.get(order.kind, 0) + 1
+
+    # Point queries, O(1)
+    def item_revenue(self, name):
+        return self.item_revenue_cents.get(name, 0) / CENTS
+
+    def customer_spend(self, customer_name):
+        return self.customer_spend_cents.get(customer_name, 0) / CENTS
+
+    def table_revenue(self, table_number):
+        return self.table_revenue_cents.get(table_number, 0) / CENTS
+
+    def type_revenue(self, kind):
+        return self.type_revenue_cents.get(kind, 0) / CENTS
+
+    # Top-N queries, read off the leaderboards (n beyond top_capacity selects over all keys)
+    def top_items(self, n=10):
+        return self._top(self._item_board, n)
+
+    def top_customers(self, n=10):
+        return self._top(self._customer_board, n)
+
+    def top_tables(self, n=10):
+        return self._top(self._table_board, n)
+
+    @staticmethod
+    def _top(board, n):
+        return [(key, cents / CENTS) for key, cents in board.top(n)]
+
+    # Orders restored from a journal by OrderManager.attach_journal
+    def restore(self, orders):
+        for order in orders:
+            self.update(order)
+
+    # Recompute everything from the given orders, e.g. OrderManager.orders
+    def rebuild(self, orders):
+        self.reset()
+        for order in orders:
+            self.update(order)
+
+    # Whether the incremental totals match a rebuild from scratch
+    def verify(self, orders):
+        fresh = SalesAggregatesObserver(self.top_capacity)
+        fresh.rebuild(orders)
+        return fresh.snapshot() == self.snapshot()
+
+    def snapshot(self):
+        return {
+            "order_count": self.order_count,
+            "revenue_cents": self.revenue_cents,
+            "item_revenue_cents": dict(self.item_revenue_cents),
+            "item_quantity": dict(self.item_quantity),
+            "customer_spend_cents": dict(self.customer_spend_cents),
+            "customer_orders": dict(self.customer_orders),
+            "table_revenue_cents": dict(self.table_revenue_cents),
+            "table_orders": dict(self.table_orders),
+            "type_revenue_cents": dict(self.type_revenue_cents),
+            "type_orders": dict(self.type_orders),
+        }
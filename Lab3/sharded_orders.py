@@ -0,0 +1,204 @@
+import multiprocessing
+import zlib
+
+from money import CENTS
+
+# Sharded order processing: orders are partitioned by a hash of their order id
+# across worker processes, each running its own SystemFacade and OrderManager.
+# The coordinator batches create_order calls per shard and merges query results.
+
+
+# Worker process: serve requests from the coordinator until told to stop
+def _shard_worker(connection):
+    from observer import LoggingObserver, ReportGeneratorObserver
+    from system_facade import SystemFacade
+
+    facade = SystemFacade()
+    manager = facade.order_manager
+    for observer in list(manager.observers):
+        if isinstance(observer, (LoggingObserver, ReportGeneratorObserver)):
+            manager.remove_observer(observer)
+
+    while True:
+        command, argument = connection.recv()
+        try:
+            if command == "stop":
+                connection.send(("ok", None))
+                return
+            elif command == "create":
+                rejected = []
+                for order_type, order_id, customer_name, items, table_number in argument:
+                    try:
+                        facade.create_order(order_type, order_id, customer_name, items, table_number)
+                    except Exception as error:  # a bad order is rejected alone, the rest of the batch goes on
+                        rejected.append(f"Order {order_id!r} rejected: {type(error).__name__}: {error}")
+                result = rejected
+            elif command == "get":
+                order = manager.get(argument)
+                result = None if order is None else {
+                    "order_id": order.order_id,
+                    "customer_name": order.customer_name,
+                    "order_type": order.kind,
+                    "table_number": getattr(order, "table_number", None),
+                    "items": [tuple(item) for item in order.items],
+                    "subtotal_cents": order.subtotal_cents,
+                }
+            elif command == "list":
+                result = [(order.order_id, order.order_type()) for order in manager.orders]
+            elif command == "cost":
+                order_id, pricing = argument
+                result = facade.calculate_cost_cents(manager.get(order_id), *pricing)
+            elif command == "report":
+                order_id, format, pricing = argument
+                result = facade.generate_report(manager.get(order_id), format, *pricing)
+            elif command == "aggregates":
+                result = facade.sales_aggregates.snapshot()
+            elif command == "count":
+                result = len(manager.orders)
+            else:
+                raise ValueError(f"Unknown command: {command}")
+            connection.send(("ok", result))
+        except Exception as error:
+            connection.send(("error", f"{type(error).__name__}: {error}"))
+
+
+def _merge_counts(target, source):
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+class ShardedOrderSystem:
+    def __init__(self, shards=None, batch_size=500):
+        self.shard_count = shards or multiprocessing.cpu_count()
+        self.batch_size = batch_size
+        # spawn gives every worker a fresh interpreter, and with it a fresh OrderManager singleton
+        context = multiprocessing.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        self._pending = [[] for _ in range(self.shard_count)]  # create_order calls not yet sent
+        self._in_flight = [0] * self.shard_count  # create batches sent but not yet acknowledged
+        self._rejected = []
+        for index in range(self.shard_count):
+            parent, child = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child,), name=f"order-shard-{index}", daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Stable across runs and processes, unlike hash() of a string
+    def shard_for(self, order_id):
+        if type(order_id) is int:
+            return order_id % self.shard_count
+        return zlib.crc32(str(order_id).encode("utf-8")) % self.shard_count
+
+    def _call(self, shard, command, argument=None):
+        self._connections[shard].send((command, argument))
+        return self._receive(shard)
+
+    def _receive(self, shard):
+        status, result = self._connections[shard].recv()
+        if status == "error":
+            raise RuntimeError(f"Shard {shard}: {result}")
+        return result
+
+    # Send one request to every shard, then collect the replies, so shards work in parallel
+    def _call_all(self, command, argument=None):
+        for connection in self._connections:
+            connection.send((command, argument))
+        return [self._receive(shard) for shard in range(self.shard_count)]
+
+    # Orders are buffered per shard and sent in batches without waiting for the
+    # shard to finish the previous one (at most max_in_flight per shard); queries flush first
+    max_in_flight = 4
+
+    def create_order(self, order_type, order_id, customer_name, items, table_number=None):
+        shard = self.shard_for(order_id)
+        pending = self._pending[shard]
+        pending.append((order_type, order_id, customer_name, [tuple(item) for item in items], table_number))
+        if len(pending) >= self.batch_size:
+            self._send_batch(shard)
+
+    def _send_batch(self, shard):
+        if self._in_flight[shard] >= self.max_in_flight:
+            self._acknowledge(shard)
+        self._connections[shard].send(("create", self._pending[shard]))
+        self._pending[shard] = []
+        self._in_flight[shard] += 1
+
+    def _acknowledge(self, shard):
+        self._in_flight[shard] -= 1
+        self._rejected.extend(self._receive(shard))
+
+    def create_orders(self, orders):
+        for order_type, order_id, customer_name, items, table_number in orders:
+            self.create_order(order_type, order_id, customer_name, items, table_number)
+        self.flush()
+
+    # Send every buffered order; raises ValueError listing the rejected orders (duplicate ids, bad items)
+    def flush(self):
+        for shard in range(self.shard_count):
+            if self._pending[shard]:
+                self._send_batch(shard)
+        for shard in range(self.shard_count):
+            while self._in_flight[shard]:
+                self._acknowledge(shard)
+        if self._rejected:
+            rejected, self._rejected = self._rejected, []
+            raise ValueError("; ".join(rejected))
+
+    def get(self, order_id):
+        self.flush()
+        return self._call(self.shard_for(order_id), "get", order_id)
+
+    def calculate_cost(self, order_id, tax_rate=0, service_charge=0, discount_percentage=0):
+        self.flush()
+        pricing = (tax_rate, service_charge, discount_percentage)
+        return self._call(self.shard_for(order_id), "cost", (order_id, pricing)) / CENTS
+
+    def generate_report(self, order_id, format="text", tax_rate=0, service_charge=0, discount_percentage=0):
+        self.flush()
+        pricing = (tax_rate, service_charge, discount_percentage)
+        return self._call(self.shard_for(order_id), "report", (order_id, format, pricing))
+
+    # (order_id, description) of every order, across all shards, by order id
+    def list_orders(self):
+        self.flush()
+        merged = [entry for shard_orders in self._call_all("list") for entry in shard_orders]
+        merged.sort(key=lambda entry: entry[0])
+        return merged
+
+    def order_count(self):
+        self.flush()
+        return sum(self._call_all("count"))
+
+    # Sales aggregates of all shards merged into one snapshot (see SalesAggregatesObserver.snapshot)
+    def aggregates(self):
+        self.flush()
+        merged = {}
+        for snapshot in self._call_all("aggregates"):
+            for name, value in snapshot.items():
+                if isinstance(value, dict):
+                    _merge_counts(merged.setdefault(name, {}), value)
+                else:
+                    merged[name] = merged.get(name, 0) + value
+        return merged
+
+    def close(self):
+        if not self._processes:
+            return
+        try:
+            self.flush()
+        finally:
+            for shard, process in enumerate(self._processes):
+                if process.is_alive():
+                    self._call(shard, "stop")
+                process.join()
+                self._connections[shard].close()
+            self._processes = []
@@ -1,48 +1,185 @@
-from order import DineInOrderFactory, TakeawayOrderFactory
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from order import DineInOrderFactory, TakeawayOrderFactory, iter_item_cents
 from order_manager import OrderManager
 from cost_calculator import RegularCostCalculator
-from cost_decorator import TaxDecorator, ServiceChargeDecorator
-from report_generator import TextReportGenerator, HTMLReportGenerator
+from cost_decorator import cached_pricing
+from menu_catalog import read_menu
+from money import CENTS
+from report_generator import TextReportGenerator, HTMLReportGenerator, encoded_size, render_reports
+from order_adapter import adapt_orders, batched
 from observer import LoggingObserver, ReportGeneratorObserver
+from report_cache import ReportCache
+from sales_aggregates import SalesAggregatesObserver
+from order_rankings import OrderRankingsObserver
+from order_export import export_orders
 
 class SystemFacade:
     def __init__(self):
         self.order_manager = OrderManager()
 
-        # Register observers
-        self.order_manager.register_observer(LoggingObserver())
-        self.order_manager.register_observer(ReportGeneratorObserver())
+        # Register observers; the OrderManager is shared, so every further
+        # SystemFacade reuses the observers registered by the first one
+        self.order_manager.ensure_observer(LoggingObserver)
+        self.order_manager.ensure_observer(ReportGeneratorObserver)
+        self.sales_aggregates = self.order_manager.ensure_observer(SalesAggregatesObserver)
+        self.rankings = self.order_manager.ensure_observer(OrderRankingsObserver)
 
         self.regular_calculator = RegularCostCalculator()
         self.text_report_generator = TextReportGenerator()
         self.html_report_generator = HTMLReportGenerator()
+        self.report_cache = ReportCache()
+        self.instrumentation = self.order_manager.instrumentation  # shared with OrderManager
+        self.catalog = self.order_manager.catalog
+
+    # Put items on the menu from (name, price) pairs or a CSV file with the header name,price
+    def load_menu(self, items):
+        if hasattr(items, "read"):
+            items = read_menu(items)
+        for name, price in items:
+            self.catalog.add_item(name, price)
 
+    # Items are (name or menu item id, quantity[, price]); without a price the menu price applies
     def create_order(self, order_type, order_id, customer_name, items, table_number=None):
+        stats = self.instrumentation
+        start = stats.now() if stats.enabled else 0
         if order_type == "dine-in":
             factory = DineInOrderFactory(table_number)
         else:
             factory = TakeawayOrderFactory()
 
         order = factory.create_order(order_id, customer_name)
-        order.items = items
+        order.items = self.catalog.build_items(items)
+        if start:
+            stats.record("create", start)
+            stats.increment("orders_created")
         self.order_manager.add_order(order)
         return order
 
-    def calculate_cost(self, order, tax_rate=0, service_charge=0):
-        calculator = self.regular_calculator
-        if tax_rate > 0:
-            calculator = TaxDecorator(calculator, tax_rate)
-        if service_charge > 0:
-            calculator = ServiceChargeDecorator(calculator, service_charge)
+    # Adapt external order dicts and add them to the order manager in batches
+    def create_orders(self, external_orders, batch_size=1000):
+        orders = []
+        for batch in batched(adapt_orders(external_orders, self.catalog), batch_size):
+            self.order_manager.add_orders(batch)
+            orders.extend(batch)
+        return orders
+
+    # Exact total in integer cents
+    def calculate_cost_cents(self, order, tax_rate=0, service_charge=0, discount_percentage=0):
+        stats = self.instrumentation
+        start = stats.now() if stats.enabled else 0
+        # The decorator chain for a configuration is compiled once and cached
+        price = cached_pricing(tax_rate, service_charge, discount_percentage)
+        total = price(order)
+        if start:
+            stats.record("pricing", start)
+        return total
 
-        return calculator.calculate_total(order)
+    def calculate_cost(self, order, tax_rate=0, service_charge=0, discount_percentage=0):
+        return self.calculate_cost_cents(order, tax_rate, service_charge, discount_percentage) / CENTS
 
-    def generate_report(self, order, format="text"):
-        total_cost = self.calculate_cost(order)
+    def _report_generator(self, format):
         if format == "text":
-            return self.text_report_generator.generate_report(order, total_cost)
+            return self.text_report_generator
         elif format == "html":
-            return self.html_report_generator.generate_report(order, total_cost)
+            return self.html_report_generator
+        raise ValueError(f"Unknown report format: {format}")
+
+    # Reports are cached per order version, format and pricing configuration,
+    # so an edited order is re-rendered and an unchanged one is served from the cache
+    def generate_report(self, order, format="text", tax_rate=0, service_charge=0, discount_percentage=0):
+        stats = self.instrumentation
+        pricing = (tax_rate, service_charge, discount_percentage)
+        report = self.report_cache.get(order.order_id, order.version, format, pricing)
+        if report is None:
+            total_cents = self.calculate_cost_cents(order, tax_rate, service_charge, discount_percentage)
+            start = stats.now() if stats.enabled else 0
+            report = self._report_generator(format).generate_report(order, total_cents)
+            self.report_cache.put(order.order_id, order.version, format, pricing, report)
+            if start:
+                stats.record("render", start)
+                stats.increment("cache_misses")
+                stats.increment("bytes_rendered", encoded_size(report))
+        elif stats.enabled:
+            stats.increment("cache_hits")
+        return report
+
+    # Stream the report into a text or binary file-like sink instead of building a string
+    def write_report(self, order, sink, format="text"):
+        total_cents = self.calculate_cost_cents(order)
+        stats = self.instrumentation
+        start = stats.now() if stats.enabled else 0
+        written = self._report_generator(format).write_report(order, total_cents, sink)
+        if start:
+            stats.record("render", start)
+            stats.increment("bytes_rendered", written)
+        return written
+
+    # Price and render reports for many orders (all managed orders by default)
+    # across a process pool. Orders are sent to the workers in chunks of
+    # (index, quantity, cents) rows plus the item names the chunk uses; the
+    # workers price them and the reports come back in input order. At most two
+    # chunks per worker are built and in flight at a time.
+    def generate_reports(self, orders=None, format="text", workers=None, chunk_size=500,
+                         tax_rate=0, service_charge=0, discount_percentage=0):
+        self._report_generator(format)  # an unknown format fails here, not in a worker
+        orders = list(self.order_manager.orders if orders is None else orders)
+        pricing = (tax_rate, service_charge, discount_percentage)
+        cached_pricing(*pricing)  # so are bad rates
+        chunks = self._report_jobs(orders, chunk_size)
+        workers = workers or os.cpu_count() or 1
+
+        reports = []
+        if workers == 1 or len(orders) <= chunk_size:
+            for item_names, jobs in chunks:
+                reports.extend(render_reports(format, item_names, pricing, jobs))
+            return reports
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for item_names, jobs in chunks:
+                if len(pending) == 2 * workers:
+                    reports.extend(pending.popleft().result())
+                pending.append(pool.submit(render_reports, format, item_names, pricing, jobs))
+            while pending:
+                reports.extend(pending.popleft().result())
+        return reports
+
+    # Chunks of (item names, jobs), built one at a time. Jobs are (order id, rows)
+    # with rows of (index into the chunk's item names, quantity, cents).
+    def _report_jobs(self, orders, chunk_size):
+        item_names, item_indexes, jobs = [], {}, []
+        for order in orders:
+            rows = []
+            for name, quantity, price_cents in iter_item_cents(order):
+                item_index = item_indexes.get(name)
+                if item_index is None:
+                    item_index = item_indexes[name] = len(item_names)
+                    item_names.append(name)
+                rows.append((item_index, quantity, price_cents))
+            jobs.append((order.order_id, rows))
+            if len(jobs) == chunk_size:
+                yield item_names, jobs
+                item_names, item_indexes, jobs = [], {}, []
+        if jobs:
+            yield item_names, jobs
+
+    # Write orders (all managed orders by default) to a CSV or binary export file, see order_export
+    def export_orders(self, path, format="csv", orders=None):
+        if orders is None:
+            orders = self.order_manager.orders
+        return export_orders(orders, path, format)
+
+    def enable_instrumentation(self, enabled=True):
+        self.instrumentation.enabled = enabled
+
+    # Per-stage latency summaries and counters of the facade and the order manager
+    def stats(self):
+        return self.instrumentation.stats()
+
+    def stats_snapshot(self):
+        return self.instrumentation.snapshot()
 
     def list_all_orders(self):
         self.order_manager.list_orders()
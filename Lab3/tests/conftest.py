@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# The Lab3 modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_manager import OrderManager  # noqa: E402
+
+
+def _reset(manager):
+    manager.disable_async_dispatch()
+    manager.detach_journal()
+    manager.observers = []
+    manager.instrumentation.enabled = False
+    manager.instrumentation.reset()
+    manager.catalog.max_items = None
+    manager.clear()
+
+
+# The OrderManager singleton, emptied before and after the test
+@pytest.fixture
+def order_manager():
+    manager = OrderManager()
+    _reset(manager)
+    yield manager
+    _reset(manager)
@@ -0,0 +1,93 @@
+import sys
+import threading
+
+import pytest
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+from sales_aggregates import SalesAggregatesObserver
+
+
+def _order(order_id):
+    if order_id % 2:
+        order = DineInOrderFactory(order_id % 7).create_order(order_id, f"Customer {order_id % 5}")
+    else:
+        order = TakeawayOrderFactory().create_order(order_id, f"Customer {order_id % 5}")
+    order.items = [(f"Item {order_id % 11}", 1 + order_id % 3, 1 + order_id % 4), ("Soda", 1, 1.99)]
+    return order
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible to bring races out
+    yield
+    sys.setswitchinterval(interval)
+
+
+# Run the targets on threads started together
+def _run(targets):
+    barrier = threading.Barrier(len(targets))
+
+    def start(target):
+        barrier.wait()
+        target()
+
+    threads = [threading.Thread(target=start, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_no_orders_lost_or_duplicated(order_manager, fast_switching):
+    aggregates = SalesAggregatesObserver()
+    order_manager.register_observer(aggregates)
+    thread_count, per_thread = 4, 300
+    rejected = [0] * thread_count
+
+    # Thread t adds its own orders, then tries to add the orders of thread t + 1 again
+    def intake(t):
+        def run():
+            for share in (t, (t + 1) % thread_count):
+                for order_id in range(share * per_thread, (share + 1) * per_thread):
+                    try:
+                        order_manager.add_order(_order(order_id))
+                    except ValueError:
+                        rejected[t] += 1
+        return run
+
+    _run([intake(t) for t in range(thread_count)])
+    ids = sorted(order.order_id for order in order_manager.orders)
+    assert ids == list(range(thread_count * per_thread))
+    assert sum(rejected) == thread_count * per_thread
+    assert aggregates.order_count == len(ids)
+    assert aggregates.verify(order_manager.orders)
+
+
+def test_edits_of_stored_orders_during_intake(order_manager, fast_switching):
+    first = _order(0)
+    order_manager.add_order(first)
+    expected = list(first.items)
+
+    def edit():
+        for step in range(2000):
+            first.add_item("Fries", 2, 1.5)
+            expected.append(("Fries", 2, 1.5))
+            first.update_item(0, quantity=1 + step % 4)
+            expected[0] = expected[0]._replace(quantity=1 + step % 4)
+            first.remove_item(1)
+            del expected[1]
+
+    def intake(offset):
+        def run():
+            for order_id in range(offset, 6000, 3):
+                order_manager.add_order(_order(order_id))
+        return run
+
+    _run([edit, intake(1), intake(2), intake(3)])
+    assert list(first.items) == expected
+    assert first.subtotal_cents == sum(quantity * round(price * 100) for _, quantity, price in expected)
+    first.invalidate_subtotal()
+    assert first.subtotal_cents == sum(quantity * round(price * 100) for _, quantity, price in expected)
+    for order in order_manager.orders[1:]:
+        assert list(order.items) == list(_order(order.order_id).items), order.order_id
@@ -0,0 +1,43 @@
+import random
+
+from cost_calculator import DiscountedCostCalculator, RegularCostCalculator, calculate_subtotals_cents
+from cost_decorator import ServiceChargeDecorator, TaxDecorator
+from line_item_store import LineItemStore
+from order import TakeawayOrderFactory
+
+
+def _order(order_id, rng):
+    order = TakeawayOrderFactory().create_order(order_id, "Ann")
+    order.items = [(f"Item {rng.randrange(30)}", rng.randint(1, 5), rng.randint(1, 3000) / 100)
+                   for _ in range(rng.randint(0, 4))]
+    return order
+
+
+def test_batch_subtotals_match_single_orders(order_manager):
+    rng = random.Random(11)
+    orders = [_order(order_id, rng) for order_id in range(300)]
+    order_manager.add_orders(orders[:250])  # the rest stay plain lists
+    for order in orders[10:20]:
+        order.add_item("Fries", 2, 3.25)  # moves the rows to the end of the store
+    other = TakeawayOrderFactory().create_order(999, "Bob")
+    other.items = LineItemStore().add_items(0, [("Soda", 3, 1.99)])
+    batch = rng.sample(orders, 120) + orders[40:60] + [orders[0], orders[-1], other]
+    for order in batch:
+        if rng.random() < 0.7:
+            order.invalidate_subtotal()
+    expected = [order.items.subtotal_cents() if hasattr(order.items, "subtotal_cents") else
+                sum(quantity * round(price * 100) for _, quantity, price in order.items) for order in batch]
+    assert calculate_subtotals_cents(batch) == expected
+
+
+def test_batch_totals_match_single_orders(order_manager):
+    rng = random.Random(12)
+    orders = [_order(order_id, rng) for order_id in range(200)]
+    order_manager.add_orders(orders)
+    batch = orders[::3]
+    for calculator in (RegularCostCalculator(), DiscountedCostCalculator(12.5),
+                       ServiceChargeDecorator(TaxDecorator(DiscountedCostCalculator(7), 8.25), 2.5)):
+        single = [calculator.calculate_total_cents(order) for order in batch]
+        for order in batch:
+            order.invalidate_subtotal()
+        assert calculator.calculate_totals_cents(batch) == single
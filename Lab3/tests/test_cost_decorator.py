@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from cost_calculator import DiscountedCostCalculator, RegularCostCalculator
+from cost_decorator import ServiceChargeDecorator, TaxDecorator, cached_pricing, compile_pricing
+from order import TakeawayOrderFactory
+from promotions import ItemDiscount, PromotionCalculator
+
+
+def _orders(count=200, seed=5):
+    rng = random.Random(seed)
+    orders = []
+    for order_id in range(count):
+        order = TakeawayOrderFactory().create_order(order_id, "Ann")
+        order.items = [(f"Item {rng.randrange(20)}", rng.randint(1, 5), rng.randint(1, 3000) / 100)
+                       for _ in range(rng.randint(1, 5))]
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.parametrize("base", [RegularCostCalculator(), DiscountedCostCalculator(12.5),
+                                  PromotionCalculator([ItemDiscount("Item 1", percentage=30)])])
+def test_compiled_chain_matches_the_nested_calls(base):
+    calculator = ServiceChargeDecorator(TaxDecorator(base, 8.25), 2.5)
+    price = compile_pricing(calculator)
+    orders = _orders()
+    assert [price(order) for order in orders] == [calculator.calculate_total_cents(order) for order in orders]
+    assert calculator.calculate_totals_cents(orders) == [price(order) for order in orders]
+
+
+def test_cached_pricing_is_reused():
+    assert cached_pricing(10, 1, 5) is cached_pricing(10, 1, 5)
+    order = _orders(1)[0]
+    calculator = ServiceChargeDecorator(TaxDecorator(DiscountedCostCalculator(5), 10), 1)
+    assert cached_pricing(10, 1, 5)(order) == calculator.calculate_total_cents(order)
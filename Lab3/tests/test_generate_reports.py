@@ -0,0 +1,51 @@
+import pytest
+
+from order import TakeawayOrderFactory
+from system_facade import SystemFacade
+
+
+def _facade_with_orders(count):
+    facade = SystemFacade()
+    facade.create_orders({"id": order_id, "customer_name": f"Customer {order_id}",
+                          "items": [{"name": "Burger", "quantity": 1 + order_id % 3, "price": 8.5},
+                                    {"name": f"Special {order_id % 7}", "quantity": 1, "price": 2.25}]}
+                         for order_id in range(count))
+    return facade
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reports_match_the_single_order_path(order_manager, workers):
+    facade = _facade_with_orders(30)
+    reports = facade.generate_reports(format="html", workers=workers, chunk_size=8, tax_rate=8.25, service_charge=2)
+    assert reports == [facade.generate_report(order, "html", 8.25, 2) for order in order_manager.orders]
+
+
+def test_orders_outside_the_store_are_priced_in_the_workers(order_manager):
+    facade = _facade_with_orders(0)
+    order = TakeawayOrderFactory().create_order(1, "Ann")
+    order.items = [("Never Stored", 3, 1.1)]
+    [report] = facade.generate_reports([order], discount_percentage=10)
+    assert "Never Stored - 3 @ 1.10 each" in report and report.endswith("Total Cost: 2.97\n")
+
+
+def test_unknown_format_is_rejected_before_any_work(order_manager):
+    facade = _facade_with_orders(3)
+    with pytest.raises(ValueError):
+        facade.generate_reports(format="pdf", workers=2, chunk_size=1)
+
+
+def test_more_chunks_than_the_submission_window(order_manager):
+    facade = _facade_with_orders(30)
+    reports = facade.generate_reports(workers=2, chunk_size=2)
+    assert reports == [facade.generate_report(order) for order in order_manager.orders]
+
+
+def test_chunks_carry_only_the_names_they_use(order_manager):
+    facade = _facade_with_orders(14)
+    chunks = list(facade._report_jobs(order_manager.orders, chunk_size=7))
+    assert [len(jobs) for _, jobs in chunks] == [7, 7]
+    for item_names, jobs in chunks:
+        assert sorted(item_names) == ["Burger"] + [f"Special {index}" for index in range(7)]
+        for order_id, rows in jobs:
+            order = order_manager.get(order_id)
+            assert [(item_names[index], quantity, cents / 100) for index, quantity, cents in rows] == list(order.items)
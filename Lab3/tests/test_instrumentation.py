@@ -0,0 +1,64 @@
+import io
+import threading
+
+from instrumentation import Instrumentation, LatencyHistogram
+from observer import Observer
+from order import TakeawayOrderFactory
+from system_facade import SystemFacade
+
+
+class CountingObserver(Observer):
+    def update(self, order):
+        pass
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ns in (100, 200, 300, 5000):
+        histogram.record(ns)
+    summary = histogram.summary()
+    assert (summary["count"], summary["min_ns"], summary["max_ns"]) == (4, 100, 5000)
+    assert summary["p50_ns"] == 256 and summary["p99_ns"] == 5000
+
+
+def test_concurrent_updates_are_not_lost():
+    stats = Instrumentation(enabled=True)
+
+    def work():
+        for _ in range(20000):
+            stats.increment("events")
+            stats.record("stage", stats.now())
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stats.counters["events"] == 160000
+    assert stats.stats()["stages"]["stage"]["count"] == 160000
+
+
+def test_bytes_rendered_counts_encoded_bytes(order_manager):
+    facade = SystemFacade()
+    facade.enable_instrumentation()
+    order = facade.create_order("takeaway", 1, "Zoë", [("Crème brûlée", 1, 6.5)])
+    report = facade.generate_report(order)
+    sink = io.BytesIO()
+    written = facade.write_report(order, sink)
+    assert written == len(sink.getvalue()) == len(report.encode("utf-8")) > len(report)
+    assert facade.stats()["counters"]["bytes_rendered"] == 2 * written
+
+
+def test_async_submissions_are_not_counted_as_callbacks(order_manager):
+    order_manager.register_observer(CountingObserver())
+    order_manager.register_observer(CountingObserver())
+    order_manager.instrumentation.enabled = True
+    order_manager.enable_async_dispatch()
+    for order_id in range(10):
+        order = TakeawayOrderFactory().create_order(order_id, "Ann")
+        order.items = [("Burger", 1, 8.5)]
+        order_manager.add_order(order)
+    order_manager.flush()
+    counters = order_manager.instrumentation.counters
+    assert counters["notifications_queued"] == 10
+    assert counters["observer_callbacks"] == 20
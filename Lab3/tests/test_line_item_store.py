@@ -0,0 +1,51 @@
+import pytest
+
+from line_item_store import LineItemStore
+from order import TakeawayOrderFactory
+
+
+def _order(order_id, items):
+    order = TakeawayOrderFactory().create_order(order_id, "Ann")
+    order.items = items
+    return order
+
+
+def test_views_read_back_the_stored_items():
+    store = LineItemStore()
+    first = store.add_items(0, [("Burger", 2, 8.5), ("Soda", 1, 1.99)])
+    second = store.add_items(1, [("Soda", 3, "1.99")])
+    assert list(first) == [("Burger", 2, 8.5), ("Soda", 1, 1.99)]
+    assert second.rows() == [(store.intern_item("Soda"), 3, 199)]
+    assert store.total_revenue_cents() == 2 * 850 + 199 + 3 * 199
+    assert store.quantity_by_item() == {"Burger": 2, "Soda": 4}
+
+
+@pytest.mark.parametrize("bad_item", [("Soda", 10 ** 30, 1.99), ("Soda", 2.5, 1.99), ("Soda", "2", 1.99),
+                                      ("Soda", 1, 1e30)])
+def test_bad_item_rejects_the_whole_order(bad_item):
+    store = LineItemStore()
+    store.add_items(0, [("Burger", 1, 8.5)])
+    with pytest.raises(ValueError):
+        store.add_items(1, [("Burger", 2, 8.5), bad_item])
+    assert len(store) == 1 and len(store.quantities) == 1 and len(store.order_indexes) == 1
+    view = store.add_items(1, [("Soda", 2, 1.99)])
+    assert view.subtotal_cents() == 398
+    assert store.total_revenue_cents() == 850 + 398
+
+
+def test_whole_float_quantity_is_stored_as_int():
+    store = LineItemStore()
+    view = store.add_items(0, [("Burger", 2.0, 8.5)])
+    assert view[0].quantity == 2 and type(view[0].quantity) is int
+
+
+def test_rejected_order_is_not_stored_or_journaled(order_manager, tmp_path):
+    from order_journal import OrderJournal
+
+    order_manager.attach_journal(OrderJournal(str(tmp_path / "orders.journal")))
+    order_manager.add_order(_order(1, [("Burger", 1, 8.5)]))
+    with pytest.raises(ValueError):
+        order_manager.add_order(_order(2, [("Burger", 1, 8.5), ("Soda", 0.5, 1.99)]))
+    order_manager.add_order(_order(2, [("Soda", 2, 1.99)]))
+    assert order_manager.total_revenue() == 8.5 + 3.98
+    assert [len(order.items) for order in order_manager.journal.replay()] == [1, 1]
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from main import main
+
+
+def _write_feed(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+@pytest.mark.parametrize("bad_record, reason", [
+    ({"id": 3, "items": []}, "missing field 'customer_name'"),
+    ({"id": 3, "customer_name": "Cid", "items": [{"name": "Soda"}]}, "missing field 'quantity'"),
+    ({"id": 3, "customer_name": "Cid", "items": 5}, "TypeError"),
+])
+def test_bad_record_is_reported(order_manager, tmp_path, capsys, bad_record, reason):
+    good = [{"id": order_id, "customer_name": "Ann", "items": [{"name": "Burger", "quantity": 1, "price": 8.5}]}
+            for order_id in (1, 2)]
+    feed = _write_feed(tmp_path / "orders.jsonl", good + [bad_record])
+    assert main(["--batch", feed, "--batch-size", "2", "--output", str(tmp_path / "reports")]) == 1
+    error = capsys.readouterr().err
+    assert "Order record 3 (id 3)" in error and reason in error
+    assert "2 orders before it were added" in error
+
+
+def test_batch_writes_reports(order_manager, tmp_path, capsys):
+    feed = _write_feed(tmp_path / "orders.jsonl",
+                       [{"id": 1, "customer_name": "Ann", "items": [{"name": "Burger", "quantity": 2, "price": 8.5}]}])
+    assert main(["--batch", feed, "--output", str(tmp_path / "reports")]) == 0
+    assert "Total Cost: 17.00" in (tmp_path / "reports" / "order_1.txt").read_text()
@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+from menu_catalog import MenuCatalog, read_menu
+
+
+def test_intern_gives_stable_ids():
+    catalog = MenuCatalog([("Burger", 8.5)])
+    assert catalog.intern("Burger") == 0
+    assert catalog.intern("Soda") == 1
+    assert catalog.intern("Soda") == 1
+    assert catalog.name_of(1) == "Soda"
+    assert catalog.menu() == {"Burger": 8.5}
+
+
+def test_menu_prices():
+    catalog = MenuCatalog([("Burger", "8.50")])
+    assert catalog.price_cents_of("Burger") == 850
+    assert catalog.line_item("Burger", 2) == ("Burger", 2, 8.5)
+    assert catalog.line_item("Burger", 1, 7) == ("Burger", 1, 7)
+    with pytest.raises(ValueError):
+        catalog.line_item("Caviar", 1)
+    catalog.intern("Soda")
+    with pytest.raises(ValueError):
+        catalog.price_of("Soda")
+
+
+def test_on_menu():
+    catalog = MenuCatalog([("Burger", 8.5)])
+    catalog.intern("Soda")
+    assert catalog.on_menu("Burger") and catalog.on_menu(0)
+    assert not catalog.on_menu("Soda") and not catalog.on_menu(1)
+    assert not catalog.on_menu("Caviar") and not catalog.on_menu(5)
+
+
+def test_max_items_bounds_new_names():
+    catalog = MenuCatalog([("Burger", 8.5)], max_items=2)
+    catalog.intern("Soda")
+    with pytest.raises(ValueError, match="full"):
+        catalog.intern("Caviar")
+    assert catalog.intern("Soda") == 1  # known names still resolve
+    assert len(catalog) == 2
+
+
+def test_read_menu():
+    assert read_menu(io.StringIO("name,price\nBurger,8.50\nSoda,1.99\n")) == [("Burger", "8.50"), ("Soda", "1.99")]
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+import pytest
+
+from money import divide_half_up, format_cents, percent_of, rate_units, to_cents
+
+
+@pytest.mark.parametrize("amount, cents", [(12, 1200), (8.5, 850), (1.005, 101), ("1.005", 101), (2.675, 268),
+                                           (Decimal("0.125"), 13), (-1.005, -101)])
+def test_to_cents_rounds_half_away_from_zero(amount, cents):
+    assert to_cents(amount) == cents
+
+
+@pytest.mark.parametrize("amount", ["abc", "", "1,50", float("nan"), float("inf"), "NaN"])
+def test_bad_amount_raises_value_error(amount):
+    with pytest.raises(ValueError):
+        to_cents(amount)
+    with pytest.raises(ValueError):
+        rate_units(amount)
+
+
+def test_percentages_round_to_whole_cents():
+    assert rate_units(8.25) == 82500
+    assert percent_of(1999, rate_units(10)) == 200
+    assert percent_of(-1999, rate_units(10)) == -200
+    assert divide_half_up(5, 2) == 3 and divide_half_up(-5, 2) == -3
+
+
+def test_format_cents():
+    assert [format_cents(cents) for cents in (0, 5, 1230, -1230, -5)] == ["0.00", "0.05", "12.30", "-12.30", "-0.05"]
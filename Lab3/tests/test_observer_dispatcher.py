@@ -0,0 +1,85 @@
+import queue
+import threading
+
+import pytest
+
+from observer import Observer
+from observer_dispatcher import DROP_OLDEST, ERROR
+from order import TakeawayOrderFactory
+
+
+class RecordingObserver(Observer):
+    def __init__(self, gate=None):
+        self.order_ids = []
+        self.gate = gate
+        self.started = threading.Event()
+
+    def update(self, order):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.order_ids.append(order.order_id)
+
+
+def _order(order_id):
+    order = TakeawayOrderFactory().create_order(order_id, "Ann")
+    order.items = [("Burger", 1, 8.5)]
+    return order
+
+
+def test_async_delivery_keeps_the_order_sequence(order_manager):
+    observer = RecordingObserver()
+    order_manager.register_observer(observer)
+    order_manager.enable_async_dispatch(max_queue_size=4)
+    order_manager.add_orders(_order(order_id) for order_id in range(100))
+    order_manager.flush()
+    assert observer.order_ids == list(range(100))
+
+
+def test_error_policy_rejects_the_order_before_it_is_stored(order_manager):
+    gate = threading.Event()
+    observer = RecordingObserver(gate)
+    order_manager.register_observer(observer)
+    order_manager.enable_async_dispatch(max_queue_size=1, policy=ERROR)
+    order_manager.add_order(_order(1))
+    observer.started.wait(5)     # the consumer holds order 1
+    order_manager.add_order(_order(2))  # fills the queue
+    with pytest.raises(queue.Full):
+        order_manager.add_order(_order(3))
+    assert not order_manager.has_order(3)
+    assert [order.order_id for order in order_manager.orders] == [1, 2]
+
+    gate.set()
+    order_manager.flush()
+    order_manager.add_order(_order(3))  # accepted again once the queue drained
+    order_manager.flush()
+    assert observer.order_ids == [1, 2, 3]
+
+
+def test_failed_order_gives_its_queue_slot_back(order_manager):
+    order_manager.enable_async_dispatch(max_queue_size=1, policy=ERROR)
+    order_manager.add_order(_order(1))
+    order_manager.flush()
+    for order_id in range(2, 5):
+        bad_order = _order(order_id)
+        bad_order.items = [("Burger", 0.5, 8.5)]
+        with pytest.raises(ValueError):
+            order_manager.add_order(bad_order)
+    order_manager.add_order(_order(5))
+    assert [order.order_id for order in order_manager.orders] == [1, 5]
+
+
+def test_drop_oldest_policy_counts_dropped_notifications(order_manager):
+    gate = threading.Event()
+    observer = RecordingObserver(gate)
+    order_manager.register_observer(observer)
+    dispatcher = order_manager.enable_async_dispatch(max_queue_size=2, policy=DROP_OLDEST)
+    order_manager.add_order(_order(1))
+    observer.started.wait(5)
+    for order_id in range(2, 6):
+        order_manager.add_order(_order(order_id))
+    gate.set()
+    order_manager.flush()
+    assert dispatcher.dropped == 2
+    assert observer.order_ids == [1, 4, 5]
+    assert len(order_manager.orders) == 5
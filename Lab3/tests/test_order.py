@@ -0,0 +1,52 @@
+import pytest
+
+from order import TakeawayOrderFactory
+
+
+def _order(order_id=1):
+    order = TakeawayOrderFactory().create_order(order_id, "Ann")
+    order.items = [("Burger", 2, 8.5), ("Soda", 1, 1.99)]
+    return order
+
+
+def _check_edits(order):
+    assert order.subtotal_cents == 1899
+    version = order.version
+    order.add_item("Fries", 2.0, 3.25)
+    order.update_item(0, quantity=1)
+    order.remove_item(1)
+    assert order.version > version
+    assert list(order.items) == [("Burger", 1, 8.5), ("Fries", 2, 3.25)]
+    assert order.cached_subtotal_cents == order.subtotal_cents == 850 + 650
+
+
+def test_item_methods_keep_the_subtotal_of_a_plain_order():
+    _check_edits(_order())
+
+
+def test_item_methods_keep_the_subtotal_of_a_stored_order(order_manager):
+    order = _order()
+    order_manager.add_order(order)
+    _check_edits(order)
+    assert order_manager.total_revenue() == 15.0
+
+
+def test_stored_items_cannot_be_changed_behind_the_order(order_manager):
+    order = _order()
+    order_manager.add_order(order)
+    with pytest.raises(TypeError):
+        order.items[0] = ("Burger", 5, 8.5)
+    with pytest.raises(TypeError):
+        del order.items[0]
+    with pytest.raises(AttributeError):
+        order.items.append(("Fries", 1, 3.25))
+    assert order.subtotal_cents == 1899
+
+
+def test_bad_item_leaves_a_stored_order_unchanged(order_manager):
+    order = _order()
+    order_manager.add_order(order)
+    version = order.version
+    with pytest.raises(ValueError):
+        order.add_item("Fries", 0.5, 3.25)
+    assert order.version == version and order.subtotal_cents == 1899
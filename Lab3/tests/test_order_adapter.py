@@ -0,0 +1,64 @@
+import io
+import json
+
+from menu_catalog import MenuCatalog
+from order_adapter import adapt_orders, read_csv_orders, read_external_orders
+
+
+def _feed(orders, separator="\n"):
+    return separator.join(json.dumps(order) for order in orders)
+
+
+ORDERS = [
+    {"id": 1, "customer_name": "Ann", "items": [{"name": "Burger", "quantity": 2, "price": 8.5}]},
+    {"id": 2, "customer_name": "Bob", "order_type": "dine-in", "table_number": 4,
+     "items": [{"name": "Soda", "quantity": 1, "price": 1.99}]},
+]
+
+
+def test_small_ndjson_feed_within_one_chunk():
+    assert list(read_external_orders(io.StringIO(_feed(ORDERS) + "\n"))) == ORDERS
+    assert list(read_external_orders(io.StringIO(_feed(ORDERS)))) == ORDERS
+
+
+def test_ndjson_feed_split_across_chunks():
+    feed = io.BytesIO((_feed(ORDERS * 50) + "\n").encode("utf-8"))
+    assert list(read_external_orders(feed, chunk_size=7)) == ORDERS * 50
+
+
+def test_json_array_feed():
+    feed = io.StringIO("[" + _feed(ORDERS, ",\n") + "]")
+    assert list(read_external_orders(feed, chunk_size=5)) == ORDERS
+
+
+def test_truncated_json_array_feed():
+    feed = io.StringIO("[" + _feed(ORDERS, ",")[:-3])
+    try:
+        list(read_external_orders(feed))
+    except ValueError:
+        return
+    raise AssertionError("truncated feed was accepted")
+
+
+def test_adapt_orders_builds_internal_orders():
+    takeaway, dine_in = adapt_orders(ORDERS)
+    assert takeaway.order_id == 1 and list(takeaway.items) == [("Burger", 2, 8.5)]
+    assert dine_in.table_number == 4
+
+
+def test_csv_orders_group_rows_and_fall_back_to_menu_prices():
+    feed = io.StringIO("order_id,order_type,customer_name,table_number,item_name,quantity,price\n"
+                       "1,dine-in,Ann,4,Burger,2,8.50\n"
+                       "1,dine-in,Ann,4,Soda,1,\n"
+                       "2,Takeaway,Bob,,Soda,3,1.50\n")
+    orders = list(read_csv_orders(feed))
+    assert orders == [
+        {"id": 1, "customer_name": "Ann", "order_type": "dine-in", "table_number": 4,
+         "items": [{"name": "Burger", "quantity": 2, "price": 8.5}, {"name": "Soda", "quantity": 1}]},
+        {"id": 2, "customer_name": "Bob", "order_type": "takeaway", "table_number": 0,
+         "items": [{"name": "Soda", "quantity": 3, "price": 1.5}]},
+    ]
+    catalog = MenuCatalog([("Soda", 1.99)])
+    first, second = adapt_orders(orders, catalog)
+    assert list(first.items) == [("Burger", 2, 8.5), ("Soda", 1, 1.99)]
+    assert second.kind == "takeaway"
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+from order_adapter import adapt_orders, read_csv_orders
+from order_export import OrderArchive, export_binary, export_csv, export_orders
+
+
+def _orders():
+    first = DineInOrderFactory(4).create_order(1, "Ann")
+    first.items = [("Burger", 2, 8.5), ("Soda", 1, 1.99)]
+    second = TakeawayOrderFactory().create_order(2, "Bob, Jr.")
+    second.items = [("Ice Cream", 3, 3.8)]
+    return [first, second]
+
+
+def _summary(orders):
+    return [(order.order_id, order.kind, order.customer_name, getattr(order, "table_number", None),
+             [tuple(item) for item in order.items]) for order in orders]
+
+
+def test_csv_roundtrip():
+    sink = io.StringIO()
+    assert export_csv(_orders(), sink, chunk_rows=1) == 3
+    sink.seek(0)
+    restored = list(adapt_orders(read_csv_orders(sink)))
+    assert _summary(restored) == _summary(_orders())
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_binary_roundtrip(order_manager, tmp_path, stored):
+    orders = _orders()
+    if stored:
+        order_manager.add_orders(orders)
+    path = tmp_path / "orders.bin"
+    export_orders(orders, path, format="binary")
+    with OrderArchive(path) as archive:
+        assert len(archive) == 2
+        assert _summary(archive.orders()) == _summary(_orders())
+        assert archive.total_revenue_cents() == 1700 + 199 + 1140
+        assert archive.revenue_cents_by_item() == {"Burger": 1700, "Soda": 199, "Ice Cream": 1140}
+
+
+def test_archive_rejects_other_files(tmp_path):
+    path = tmp_path / "orders.bin"
+    path.write_bytes(b"not an export at all, just text")
+    with pytest.raises(ValueError):
+        OrderArchive(path)
+    sink = io.BytesIO()
+    export_binary(_orders(), sink)
+    path.write_bytes(sink.getvalue()[:-16])
+    with pytest.raises(ValueError, match="Truncated"):
+        OrderArchive(path)
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_orders(_orders(), tmp_path / "orders.xml", format="xml")
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+from order_journal import SYNC_ALWAYS, SYNC_GROUP, OrderJournal
+
+
+def _order(order_id, quantity=1):
+    order = TakeawayOrderFactory().create_order(order_id, f"Customer {order_id}")
+    order.items = [("Burger", quantity, 8.5), ("Soda", 1, 1.99)]
+    return order
+
+
+def test_group_policy_writes_every_record_before_the_fsync(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    journal = OrderJournal(path, sync=SYNC_GROUP, group_size=64)
+    for order_id in range(10):
+        journal.append(_order(order_id))
+    # Nothing is held back in memory: a second reader sees every record without a commit
+    assert [order.order_id for order in OrderJournal(path).replay()] == list(range(10))
+    journal.close()
+
+
+def test_replay_restores_orders(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    journal = OrderJournal(path, sync=SYNC_ALWAYS)
+    dine_in = DineInOrderFactory(7).create_order(2, "Bob")
+    dine_in.items = [("Soup", 2, 4.25)]
+    journal.append(_order(1, quantity=3))
+    journal.append(dine_in)
+    journal.close()
+
+    takeaway, restored = OrderJournal(path).replay()
+    assert list(takeaway.items) == [("Burger", 3, 8.5), ("Soda", 1, 1.99)]
+    assert (restored.order_id, restored.table_number, restored.customer_name) == (2, 7, "Bob")
+    assert list(restored.items) == [("Soup", 2, 4.25)]
+
+
+def test_torn_last_record_is_cut_off(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    with open(path, "wb"):
+        pass
+    journal = OrderJournal(path)
+    journal.append(_order(1))
+    journal.append(_order(2))
+    journal.close()
+    intact = os.path.getsize(path)
+    with open(path, "ab") as file:
+        file.write(b"\x40\x00\x00\x00garbage")
+
+    journal = OrderJournal(path)
+    assert [order.order_id for order in journal.replay()] == [1, 2]
+    assert os.path.getsize(path) == intact
+    journal.close()
+
+
+def test_attach_journal_restores_the_manager(order_manager, tmp_path):
+    path = str(tmp_path / "orders.journal")
+    order_manager.attach_journal(OrderJournal(path))
+    order_manager.add_order(_order(1))
+    order_manager.add_order(_order(2, quantity=2))
+    order_manager.detach_journal()
+    order_manager.clear()
+
+    order_manager.attach_journal(OrderJournal(path))
+    assert [order.order_id for order in order_manager.orders] == [1, 2]
+    assert order_manager.total_revenue() == 3 * 8.5 + 2 * 1.99
+
+
+def test_string_ids_and_tables_roundtrip(tmp_path):
+    path = str(tmp_path / "orders.journal")
+    journal = OrderJournal(path)
+    dine_in = DineInOrderFactory("Terrace 3").create_order("A-17", "Ann")
+    dine_in.items = [("Soup", 1, 4.25)]
+    journal.append(dine_in)
+    journal.append(_order(2 ** 63 - 1))
+    journal.close()
+
+    restored, large = OrderJournal(path).replay()
+    assert (restored.order_id, restored.table_number, restored.kind) == ("A-17", "Terrace 3", "dine-in")
+    assert list(restored.items) == [("Soup", 1, 4.25)]
+    assert large.order_id == 2 ** 63 - 1
+
+
+@pytest.mark.parametrize("order_id, table_number, customer_name", [
+    (1.5, None, "Ann"), (None, None, "Ann"), (2 ** 63, None, "Ann"), (1, [4], "Ann"), (1, None, None),
+    (1, None, "x" * 70000)])
+def test_values_the_journal_cannot_store_are_refused(order_manager, tmp_path, order_id, table_number,
+                                                     customer_name):
+    order_manager.attach_journal(OrderJournal(str(tmp_path / "orders.journal")))
+    factory = TakeawayOrderFactory() if table_number is None else DineInOrderFactory(table_number)
+    order = factory.create_order(order_id, customer_name)
+    order.items = [("Burger", 1, 8.5)]
+    with pytest.raises(ValueError):
+        order_manager.add_order(order)
+    assert order_manager.orders == []
+    order_manager.add_order(_order(1))  # the journal is still usable
+
+
+def test_clear_empties_the_attached_journal(order_manager, tmp_path):
+    path = str(tmp_path / "orders.journal")
+    order_manager.attach_journal(OrderJournal(path))
+    order_manager.add_order(_order(1))
+    order_manager.clear()
+    order_manager.add_order(_order(1, quantity=5))  # the id is free again
+    order_manager.detach_journal()
+    order_manager.clear()
+
+    order_manager.attach_journal(OrderJournal(path))
+    [order] = order_manager.orders
+    assert list(order.items)[0] == ("Burger", 5, 8.5)
@@ -0,0 +1,50 @@
+import pytest
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+
+
+def _order(order_id, customer_name, table_number=None):
+    factory = TakeawayOrderFactory() if table_number is None else DineInOrderFactory(table_number)
+    order = factory.create_order(order_id, customer_name)
+    order.items = [("Burger", 1, 8.5)]
+    return order
+
+
+@pytest.fixture
+def orders(order_manager):
+    orders = [_order(1, "Ann", 4), _order(2, "Bob"), _order(3, "Ann"), _order(4, "Cid", 4), _order(5, "Bob", 7)]
+    order_manager.add_orders(orders)
+    return orders
+
+
+def test_get_and_has_order(order_manager, orders):
+    assert order_manager.get(3) is orders[2]
+    assert order_manager.get(99) is None
+    assert order_manager.get(99, "missing") == "missing"
+    assert order_manager.has_order(5) and not order_manager.has_order(99)
+
+
+def test_index_lookups(order_manager, orders):
+    assert order_manager.by_customer("Ann") == [orders[0], orders[2]]
+    assert order_manager.by_table(4) == [orders[0], orders[3]]
+    assert order_manager.by_type("dine-in") == [orders[0], orders[3], orders[4]]
+    assert order_manager.by_type("takeaway") == [orders[1], orders[2]]
+    assert order_manager.by_customer("Nobody") == [] and order_manager.by_table(99) == []
+    order_manager.by_customer("Ann").clear()  # a copy: the index is untouched
+    assert len(order_manager.by_customer("Ann")) == 2
+
+
+def test_duplicate_id_is_rejected(order_manager, orders):
+    with pytest.raises(ValueError, match="Order ID 2 already exists"):
+        order_manager.add_order(_order(2, "Dan", 9))
+    assert order_manager.get(2) is orders[1]
+    assert len(order_manager.orders) == 5
+    assert order_manager.by_customer("Dan") == [] and order_manager.by_table(9) == []
+
+
+def test_clear_empties_the_indexes(order_manager, orders):
+    order_manager.clear()
+    assert not order_manager.has_order(1)
+    assert order_manager.by_customer("Ann") == [] and order_manager.by_type("dine-in") == []
+    order_manager.add_order(_order(1, "Eve"))  # the id is free again
+    assert order_manager.by_customer("Eve") == [order_manager.get(1)]
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+from order_rankings import Leaderboard, OrderRankingsObserver
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _order(order_id, customer, items, table_number=None):
+    factory = TakeawayOrderFactory() if table_number is None else DineInOrderFactory(table_number)
+    order = factory.create_order(order_id, customer)
+    order.items = items
+    return order
+
+
+def test_leaderboard_matches_a_full_sort():
+    rng = random.Random(3)
+    board = Leaderboard(10)
+    for _ in range(5000):
+        board.add(f"key {rng.randrange(200)}", rng.randint(-20, 100))
+        if rng.random() < 0.05:
+            expected = sorted(board.totals.values(), reverse=True)[:10]
+            assert [total for _, total in board.top(10)] == expected
+    assert [total for _, total in board.top(50)] == sorted(board.totals.values(), reverse=True)[:50]
+
+
+def test_all_time_rankings():
+    rankings = OrderRankingsObserver(capacity=3)
+    rankings.update(_order(1, "Ann", [("Burger", 1, 8.5)], table_number=4))
+    rankings.update(_order(2, "Bob", [("Burger", 3, 8.5)], table_number=5))
+    rankings.update(_order(3, "Ann", [("Soda", 1, 1.99)], table_number=4))
+    rankings.update(_order(4, "Cid", [("Soda", 2, 1.99)]))
+    assert rankings.top_orders(2) == [(2, 25.5), (1, 8.5)]
+    assert rankings.top_customers(1) == [("Ann", 2)]
+    assert rankings.top_tables(2) == [(5, 25.5), (4, 10.49)]
+    assert rankings.orders_over(8) == [(2, 25.5), (1, 8.5)]
+    with pytest.raises(ValueError):
+        rankings.top_orders(4)
+
+
+def test_window_rankings_expire():
+    clock = _Clock()
+    rankings = OrderRankingsObserver(capacity=5, bucket_seconds=10, max_window=60, clock=clock)
+    rankings.update(_order(1, "Ann", [("Burger", 5, 8.5)]))
+    clock.now = 30
+    rankings.update(_order(2, "Bob", [("Burger", 1, 8.5)]))
+    assert rankings.top_orders(5, window=15) == [(2, 8.5)]
+    assert rankings.top_orders(5, window=60) == [(1, 42.5), (2, 8.5)]
+    clock.now = 80
+    assert rankings.top_customers(5, window=60) == [("Bob", 1)]
+    assert rankings.top_orders(5) == [(1, 42.5), (2, 8.5)]  # all time
+    with pytest.raises(ValueError):
+        rankings.top_orders(5, window=61)
+
+
+def test_restored_orders_count_all_time(order_manager):
+    rankings = OrderRankingsObserver()
+    rankings.restore([_order(1, "Ann", [("Burger", 2, 8.5)], table_number=2)])
+    assert rankings.top_orders(1) == [(1, 17.0)]
+    assert rankings.top_tables(1) == [(2, 17.0)]
+    assert rankings.top_orders(1, window=60) == []
+
+
+@pytest.mark.parametrize("capacity", [1, 2, 10])
+def test_keys_of_different_types_with_equal_totals(capacity):
+    rankings = OrderRankingsObserver(capacity=capacity)
+    rankings.update(_order(1, "Ann", [("Burger", 1, 8.5)], table_number=1))
+    rankings.update(_order(2, None, [("Burger", 1, 8.5)], table_number="1"))
+    rankings.update(_order(3, ("Ann",), [("Burger", 1, 8.5)], table_number=1.5))
+    shown = min(capacity, 3)
+    assert [total for _, total in rankings.top_tables(capacity)] == [8.5] * shown
+    assert [count for _, count in rankings.top_customers(capacity)] == [1] * shown
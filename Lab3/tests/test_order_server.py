@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import pytest
+
+from order_server import OrderServer, make_facade
+
+
+def _order(order_id, quantity=1, price=8.5):
+    return {"id": order_id, "customer_name": "Ann", "items": [{"name": "Burger", "quantity": quantity, "price": price}]}
+
+
+async def _exchange(server, requests):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    for request in requests:
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+    await writer.drain()
+    responses = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in requests]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def _serve(requests, **options):
+    async def run():
+        server = await OrderServer(make_facade(), port=0, **options).start()
+        try:
+            responses = await _exchange(server, requests)
+            while server.connections:  # let the connection handler finish
+                await asyncio.sleep(0.01)
+            return responses, server.stats()
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("bad_order", [_order(1, quantity=10 ** 30), _order(1, price="abc"), [1, 2], {"id": 1}])
+def test_bad_order_does_not_stop_the_intake(order_manager, bad_order):
+    (bad, good), stats = _serve([bad_order, _order(2, quantity=2)])
+    assert "error" in bad
+    assert good == {"id": 2, "total": 17.0}
+    assert stats["errors"] == 1
+    assert order_manager.has_order(2)
+
+
+def test_responses_keep_request_order(order_manager):
+    requests = [_order(order_id, quantity=order_id) for order_id in range(1, 51)]
+    responses, stats = _serve(requests, max_batch=8)
+    assert [response["id"] for response in responses] == list(range(1, 51))
+    assert [response["total"] for response in responses] == [8.5 * quantity for quantity in range(1, 51)]
+    assert stats["requests"] == 50 and stats["batches"] >= 7
+
+
+def test_report_requested_with_the_order(order_manager):
+    request = dict(_order(7), report="text", tax_rate=10)
+    [response], _ = _serve([request])
+    assert response["total"] == 9.35
+    assert "Burger" in response["report"]
+
+
+def test_duplicate_order_id_is_an_error(order_manager):
+    (first, second), _ = _serve([_order(3), _order(3)])
+    assert first["id"] == 3 and "total" in first
+    assert "already exists" in second["error"]
+
+
+def test_menu_only_server_refuses_unknown_items(order_manager):
+    order_manager.catalog.add_item("Burger", 8.5)
+    unknown = {"id": 1, "customer_name": "Ann", "items": [{"name": "Caviar", "quantity": 1, "price": 99}]}
+    on_menu = {"id": 2, "customer_name": "Ann", "items": [{"name": "Burger", "quantity": 2}]}
+    (refused, accepted), _ = _serve([unknown, on_menu], menu_only=True)
+    assert "Not on the menu: Caviar" in refused["error"]
+    assert accepted == {"id": 2, "total": 17.0}
+    assert "Caviar" not in order_manager.catalog
+
+
+def test_catalog_bound_refuses_new_names(order_manager):
+    names = len(order_manager.catalog)
+    orders = [{"id": order_id, "customer_name": "Ann", "items": [{"name": f"Bound test {order_id}", "quantity": 1,
+                                                                  "price": 1}]} for order_id in range(1, 4)]
+    responses, _ = _serve(orders, max_items=names + 2)
+    assert ["error" in response for response in responses] == [False, False, True]
+    assert len(order_manager.catalog) == names + 2
+    assert not order_manager.has_order(3)
+
+
+@pytest.mark.parametrize("fields", [{"report": "pdf"}, {"tax_rate": "abc"}, {"service_charge": [1]}])
+def test_refused_request_is_not_stored(order_manager, fields):
+    (refused, retried), _ = _serve([dict(_order(1), **fields), dict(_order(1), report="text")])
+    assert "error" in refused
+    assert retried["id"] == 1 and retried["total"] == 8.5 and "Burger" in retried["report"]
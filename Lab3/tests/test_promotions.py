@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from order import TakeawayOrderFactory
+from promotions import BuyXGetY, ComboBundle, HappyHour, ItemDiscount, PromotionCalculator
+
+
+def _order(items):
+    order = TakeawayOrderFactory().create_order(1, "Ann")
+    order.items = items
+    return order
+
+
+def test_item_rules():
+    calculator = PromotionCalculator([ItemDiscount("Burger", percentage=10), ItemDiscount("Soda", amount_off=0.5),
+                                      BuyXGetY("Fries", 2)], at="12:00")
+    order = _order([("Burger", 2, 8.5), ("Soda", 2, 1.99), ("Fries", 3, 3.0)])
+    assert calculator.calculate_total_cents(order) == 1530 + 298 + 600
+
+
+def test_bundle_applies_when_cheaper():
+    calculator = PromotionCalculator([ComboBundle({"Burger": 1, "Soda": 1}, 9.0)], at="12:00")
+    assert calculator.calculate_total_cents(_order([("Burger", 2, 8.5), ("Soda", 1, 1.99)])) == 900 + 850
+
+
+def test_bundle_is_skipped_when_the_item_rules_are_cheaper():
+    rules = [ItemDiscount("Pizza", percentage=50), BuyXGetY("Soda", 1),
+             ComboBundle({"Pizza": 1, "Soda": 2}, 21.0)]
+    order = _order([("Pizza", 1, 20.0), ("Soda", 2, 2.5)])
+    assert PromotionCalculator(rules, at="12:00").calculate_total_cents(order) == 1250
+
+
+def test_happy_hour_only_within_its_window():
+    rules = [HappyHour("17:00", "19:00", 20), HappyHour("23:00", "01:00", 50, ["Soda"])]
+    order = _order([("Burger", 1, 10.0), ("Soda", 2, 2.0)])
+    assert PromotionCalculator(rules, at="18:00").calculate_total_cents(order) == 1120
+    assert PromotionCalculator(rules, at="00:30").calculate_total_cents(order) == 1200
+    assert PromotionCalculator(rules, at="12:00").calculate_total_cents(order) == 1400
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError):
+        PromotionCalculator([object()])
+
+
+def test_bundles_never_make_an_order_dearer():
+    rng = random.Random(3)
+    names = [f"Item {index}" for index in range(12)]
+    item_rules = ([ItemDiscount(name, percentage=rng.choice((10, 30, 60))) for name in rng.sample(names, 6)] +
+                  [BuyXGetY(name, rng.randint(1, 3)) for name in rng.sample(names, 4)])
+    bundles = [ComboBundle({name: rng.randint(1, 2) for name in rng.sample(names, rng.randint(1, 3))},
+                           rng.uniform(1, 30)) for _ in range(40)]
+    without_bundles = PromotionCalculator(item_rules, at="12:00")
+    with_bundles = PromotionCalculator(item_rules + bundles, at="12:00")
+    for _ in range(500):
+        order = _order([(rng.choice(names), rng.randint(1, 6), rng.choice((1.5, 4.0, 9.25))) for _ in range(5)])
+        assert with_bundles.calculate_total_cents(order) <= without_bundles.calculate_total_cents(order)
+    orders = [_order([(name, 2, 4.0) for name in names])] * 3
+    assert with_bundles.calculate_totals_cents(orders) == [with_bundles.calculate_total_cents(orders[0])] * 3
+
+
+def test_rules_apply_to_each_unit_price():
+    def total(rules, items):
+        return PromotionCalculator(rules, at="12:00").calculate_total_cents(_order(items))
+
+    assert total([ItemDiscount("Pizza", percentage=50)], [("Pizza", 1, 10.0), ("Pizza", 1, 20.0)]) == 1500
+    assert total([ItemDiscount("Soda", amount_off=2.5)], [("Soda", 1, 2.0), ("Soda", 1, 5.0)]) == 250
+    assert total([BuyXGetY("Soda", 1)], [("Soda", 1, 3.0), ("Soda", 1, 2.0)]) == 300  # the cheaper unit is free
+    # The bundle takes the dearer burger; the cheaper one keeps its 10% off
+    rules = [ItemDiscount("Burger", percentage=10), ComboBundle({"Burger": 1, "Soda": 1}, 9.0)]
+    assert total(rules, [("Burger", 1, 8.0), ("Burger", 1, 10.0), ("Soda", 1, 2.0)]) == 900 + 720
+
+
+def test_single_price_per_item_matches_one_line():
+    rng = random.Random(8)
+    rules = [ItemDiscount("A", percentage=15), ItemDiscount("B", amount_off=0.4), BuyXGetY("C", 2),
+             ComboBundle({"A": 1, "C": 2}, 5.0), HappyHour("11:00", "13:00", 5)]
+    calculator = PromotionCalculator(rules, at="12:00")
+    for _ in range(200):
+        items = [(name, rng.randint(1, 4), price) for name, price in (("A", 3.5), ("B", 1.25), ("C", 2.0))]
+        split = [line for name, quantity, price in items for line in [(name, 1, price)] * quantity]
+        rng.shuffle(split)
+        assert calculator.calculate_total_cents(_order(split)) == calculator.calculate_total_cents(_order(items))
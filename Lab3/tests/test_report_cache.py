@@ -0,0 +1,49 @@
+from order import TakeawayOrderFactory
+from report_cache import ReportCache
+from system_facade import SystemFacade
+
+PRICING = (0, 0, 0)
+
+
+def _order(order_id, items):
+    order = TakeawayOrderFactory().create_order(order_id, "Ann")
+    order.items = items
+    return order
+
+
+def test_new_version_replaces_the_cached_reports():
+    cache = ReportCache()
+    cache.put(1, 5, "text", PRICING, "old")
+    assert cache.get(1, 5, "text", PRICING) == "old"
+    assert cache.get(1, 6, "text", PRICING) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_by_entries_and_size():
+    cache = ReportCache(max_entries=2, max_size=10)
+    cache.put(1, 1, "text", PRICING, "aaaa")
+    cache.put(2, 1, "text", PRICING, "bbbb")
+    cache.get(1, 1, "text", PRICING)
+    cache.put(3, 1, "text", PRICING, "cccc")
+    assert cache.get(2, 1, "text", PRICING) is None
+    assert cache.get(1, 1, "text", PRICING) == "aaaa"
+    cache.put(4, 1, "text", PRICING, "dddddddd")
+    assert len(cache) == 1 and cache.size == 8
+
+
+def test_orders_reusing_an_id_get_their_own_report(order_manager):
+    facade = SystemFacade()
+    first = facade.create_order("takeaway", 1, "Ann", [("Burger", 1, 8.5)])
+    assert "Burger" in facade.generate_report(first)
+    order_manager.clear()
+    second = facade.create_order("takeaway", 1, "Ann", [("Soup", 2, 4.25)])
+    report = facade.generate_report(second)
+    assert "Soup" in report and "Burger" not in report
+
+
+def test_edited_order_is_rendered_again(order_manager):
+    facade = SystemFacade()
+    order = facade.create_order("takeaway", 1, "Ann", [("Burger", 1, 8.5)])
+    assert facade.generate_report(order) is facade.generate_report(order)
+    order.add_item("Soda", 1, 1.99)
+    assert "Soda" in facade.generate_report(order)
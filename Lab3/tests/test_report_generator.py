@@ -0,0 +1,32 @@
+import io
+
+from order import TakeawayOrderFactory
+from report_generator import HTMLReportGenerator, TextReportGenerator
+from system_facade import SystemFacade
+
+
+def _order():
+    order = TakeawayOrderFactory().create_order(1, "Ann")
+    order.items = [("Burger", 2, 8.5), ("Soda", 1, 1.99)]
+    return order
+
+
+def test_reports_format_a_total_given_in_cents():
+    assert TextReportGenerator().generate_report(_order(), 1899) == (
+        "Order ID: 1\nItems:\nBurger - 2 @ 8.50 each\nSoda - 1 @ 1.99 each\nTotal Cost: 18.99\n")
+    assert "<p>Total Cost: 18.99</p>" in HTMLReportGenerator().generate_report(_order(), 1899)
+
+
+def test_write_report_streams_the_same_report():
+    generator = TextReportGenerator()
+    text, binary = io.StringIO(), io.BytesIO()
+    generator.write_report(_order(), 1899, text, lines_per_write=1)
+    generator.write_report(_order(), 1899, binary)
+    assert text.getvalue() == binary.getvalue().decode("utf-8") == generator.generate_report(_order(), 1899)
+
+
+def test_facade_report_total_is_exact(order_manager):
+    facade = SystemFacade()
+    order = facade.create_order("takeaway", 1, "Ann", [("Widget", 3, 0.1)])
+    assert facade.calculate_cost_cents(order, tax_rate=10) == 33
+    assert facade.generate_report(order, "text", tax_rate=10).endswith("Total Cost: 0.33\n")
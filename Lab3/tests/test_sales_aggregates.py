@@ -0,0 +1,67 @@
+import random
+
+from order import DineInOrderFactory, TakeawayOrderFactory
+from order_journal import OrderJournal
+from sales_aggregates import SalesAggregatesObserver
+from system_facade import SystemFacade
+
+
+def _orders(count, seed=7):
+    rng = random.Random(seed)
+    orders = []
+    for order_id in range(count):
+        if rng.random() < 0.5:
+            order = DineInOrderFactory(rng.randrange(20)).create_order(order_id, f"Customer {rng.randrange(300)}")
+        else:
+            order = TakeawayOrderFactory().create_order(order_id, f"Customer {rng.randrange(300)}")
+        order.items = [(f"Item {rng.randrange(500)}", rng.randint(1, 4), rng.randint(50, 2000) / 100)
+                       for _ in range(rng.randint(1, 4))]
+        orders.append(order)
+    return orders
+
+
+def _brute_top(totals, n):
+    return [cents for _, cents in sorted(totals.items(), key=lambda entry: entry[1], reverse=True)[:n]]
+
+
+def test_top_queries_match_a_full_sort():
+    aggregates = SalesAggregatesObserver(top_capacity=20)
+    orders = _orders(3000)
+    for order in orders:
+        aggregates.update(order)
+    assert aggregates.verify(orders)
+    for top, totals in ((aggregates.top_items, aggregates.item_revenue_cents),
+                        (aggregates.top_customers, aggregates.customer_spend_cents),
+                        (aggregates.top_tables, aggregates.table_revenue_cents)):
+        for n in (1, 10, 20, 50):
+            assert [round(total * 100) for _, total in top(n)] == _brute_top(totals, n)
+
+
+def test_negative_amounts_keep_the_top_queries_exact():
+    aggregates = SalesAggregatesObserver(top_capacity=2)
+    refund = TakeawayOrderFactory().create_order(99, "Ann")
+    for order in _orders(50):
+        aggregates.update(order)
+    leader, _ = aggregates.top_items(1)[0]
+    refund.items = [(leader, -1000, 1)]
+    aggregates.update(refund)
+    assert [round(total * 100) for _, total in aggregates.top_items(2)] == \
+        _brute_top(aggregates.item_revenue_cents, 2)
+
+
+def test_journal_replay_reaches_the_aggregates(order_manager, tmp_path):
+    path = str(tmp_path / "orders.journal")
+    facade = SystemFacade()
+    order_manager.attach_journal(OrderJournal(path))
+    facade.create_orders([{"id": order_id, "customer_name": "Ann", "items": [{"name": "Burger", "quantity": 1,
+                                                                              "price": 8.5}]}
+                          for order_id in range(3)])
+    order_manager.detach_journal()
+    order_manager.clear()
+    facade.sales_aggregates.reset()
+    facade.rankings.reset()
+
+    order_manager.attach_journal(OrderJournal(path))
+    assert facade.sales_aggregates.order_count == 3
+    assert facade.sales_aggregates.verify(order_manager.orders)
+    assert facade.rankings.top_customers(1) == [("Ann", 3)]
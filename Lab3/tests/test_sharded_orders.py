@@ -0,0 +1,33 @@
+import pytest
+
+from sharded_orders import ShardedOrderSystem
+
+
+def test_orders_are_spread_and_merged():
+    with ShardedOrderSystem(shards=2, batch_size=3) as system:
+        for order_id in range(10):
+            system.create_order("takeaway", order_id, f"Customer {order_id % 3}", [("Burger", 1, 8.5)])
+        assert system.order_count() == 10
+        assert [order_id for order_id, _ in system.list_orders()] == list(range(10))
+        assert system.get(7)["subtotal_cents"] == 850
+        assert system.get(70) is None
+        assert system.calculate_cost(3, tax_rate=10) == 9.35
+        assert "Burger" in system.generate_report(4)
+        aggregates = system.aggregates()
+        assert aggregates["order_count"] == 10
+
+        system.create_order("takeaway", 3, "Ann", [("Soda", 1, 1.99)])
+        with pytest.raises(ValueError):
+            system.flush()
+        assert system.order_count() == 10
+
+
+def test_bad_order_is_rejected_alone():
+    with ShardedOrderSystem(shards=1) as system:
+        system.create_order("takeaway", 1, "Ann", [("Burger", 1, 8.5)])
+        system.create_order("takeaway", 2, "Bob", [("Burger", 1, 8.5, "extra")])
+        system.create_order("takeaway", 3, "Cid", [("Soda", 2, 1.99)])
+        with pytest.raises(ValueError, match="Order 2 rejected"):
+            system.flush()
+        assert system.order_count() == 2
+        assert system.get(3)["subtotal_cents"] == 398
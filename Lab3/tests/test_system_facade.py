@@ -0,0 +1,24 @@
+from system_facade import SystemFacade
+
+
+def test_facades_share_one_set_of_observers(order_manager, capsys):
+    first = SystemFacade()
+    second = SystemFacade()
+    assert len(order_manager.observers) == 4
+    assert second.sales_aggregates is first.sales_aggregates
+    assert second.rankings is first.rankings
+
+    second.create_order("takeaway", 1, "Ann", [("Burger", 2, 8.5)])
+    assert capsys.readouterr().out.count("[Logger] Order ID 1 added") == 1
+    assert first.sales_aggregates.order_count == 1
+
+
+def test_clear_resets_aggregates_and_rankings(order_manager, capsys):
+    facade = SystemFacade()
+    facade.create_order("dine-in", 1, "Ann", [("Burger", 2, 8.5)], 4)
+    order_manager.clear()
+    assert facade.sales_aggregates.order_count == 0
+    assert facade.rankings.top_orders(5) == [] and facade.rankings.top_tables(5) == []
+    facade.create_order("takeaway", 1, "Bob", [("Soda", 1, 1.99)])
+    assert facade.sales_aggregates.verify(order_manager.orders)
+    assert facade.rankings.top_customers(5) == [("Bob", 1)]